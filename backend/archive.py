@@ -0,0 +1,176 @@
+"""Moves old orders from the hot orders collection into orders_archive.
+
+Runs periodically inside the app (ORDER_ARCHIVE_INTERVAL) and can be run by
+hand or from cron:
+
+    python archive.py --months 12
+"""
+from datetime import datetime, timedelta
+from typing import List
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+from database import (
+    orders_collection,
+    orders_archive_collection,
+    meta_collection,
+    get_database,
+    fetch_all,
+)
+import asyncio
+import logging
+import os
+import socket
+import typer
+
+logger = logging.getLogger(__name__)
+
+# Orders placed more than this many months (of 30 days) ago are archived
+ORDER_ARCHIVE_AFTER_MONTHS = int(os.environ.get('ORDER_ARCHIVE_AFTER_MONTHS', '12'))
+# Seconds between background archival runs; every worker runs the loop but
+# a lease in meta lets only one of them archive per interval. 0 disables them
+ORDER_ARCHIVE_INTERVAL = float(os.environ.get('ORDER_ARCHIVE_INTERVAL', '3600'))
+# Orders copied and deleted per round trip
+ORDER_ARCHIVE_BATCH_SIZE = int(os.environ.get('ORDER_ARCHIVE_BATCH_SIZE', '1000'))
+# Times an order updated mid-move is copied again before its batch is rolled back
+ORDER_ARCHIVE_RECOPY_ATTEMPTS = 3
+
+# meta document naming the worker allowed to archive until expires_at
+ARCHIVE_LEASE_ID = "order_archive_lease"
+ARCHIVE_LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+# Same order as server.ORDER_SORT, oldest first
+ORDER_ARCHIVE_SORT = [("created_at", 1), ("id", 1)]
+
+# Archived orders are rarely read, so trade CPU for a smaller footprint
+ARCHIVE_STORAGE_ENGINE = {"wiredTiger": {"configString": "block_compressor=zstd"}}
+DUPLICATE_KEY = 11000
+
+cli = typer.Typer(add_completion=False)
+
+
+async def ensure_archive_collection() -> None:
+    """Create orders_archive with zstd block compression if it does not exist yet."""
+    db = get_database()
+    if await db.list_collection_names(filter={"name": orders_archive_collection.name}):
+        return
+    try:
+        await db.create_collection(orders_archive_collection.name, storageEngine=ARCHIVE_STORAGE_ENGINE)
+    except CollectionInvalid:
+        pass  # another worker created it first
+    except OperationFailure:
+        # Storage engine without zstd support; fall back to the server default
+        await db.create_collection(orders_archive_collection.name)
+
+
+async def archive_orders(months: int = ORDER_ARCHIVE_AFTER_MONTHS, batch_size: int = ORDER_ARCHIVE_BATCH_SIZE) -> int:
+    """Move orders older than `months` into the archive; returns how many moved.
+
+    Readers page across (orders, orders_archive) assuming every archived
+    order sorts before every hot one, so each batch is moved whole. Orders
+    are copied first and deleted second, so a crash in between leaves
+    duplicates that readers skip and the next run cleans up. An order whose
+    status changes after it was copied is copied again at once; if it keeps
+    changing, the rest of its batch is moved back and the run stops there.
+    """
+    await ensure_archive_collection()
+    cutoff = datetime.utcnow() - timedelta(days=30 * months)
+    moved = 0
+    while True:
+        batch = await fetch_all(
+            orders_collection.find({"created_at": {"$lt": cutoff}})
+            .sort(ORDER_ARCHIVE_SORT)
+            .limit(batch_size)
+        )
+        if not batch:
+            return moved
+
+        try:
+            await orders_archive_collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Copies left behind by an interrupted run are fine
+            if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                raise
+
+        pending = batch
+        for _ in range(ORDER_ARCHIVE_RECOPY_ATTEMPTS):
+            result = await orders_collection.bulk_write(
+                [DeleteOne({"id": order["id"], "status": order["status"]}) for order in pending],
+                ordered=False
+            )
+            moved += result.deleted_count
+            if result.deleted_count == len(pending):
+                break
+            # Orders updated since they were copied: copy the current version
+            pending = await fetch_all(orders_collection.find({"id": {"$in": [order["id"] for order in pending]}}))
+            if not pending:
+                break
+            await orders_archive_collection.bulk_write(
+                [ReplaceOne({"id": order["id"]}, order, upsert=True) for order in pending],
+                ordered=False
+            )
+        else:
+            moved -= await _restore_after(pending, batch)
+            return moved
+
+
+async def _restore_after(stuck: List[dict], batch: List[dict]) -> int:
+    """Move batch orders sorting after the earliest stuck one back to orders; returns how many."""
+    first = min((order["created_at"], order["id"]) for order in stuck)
+    later = [order["id"] for order in batch if (order["created_at"], order["id"]) > first]
+    stuck_ids = [order["id"] for order in stuck]
+    restored = await fetch_all(orders_archive_collection.find({"id": {"$in": later}}))
+    restored = [order for order in restored if order["id"] not in stuck_ids]
+    if restored:
+        try:
+            await orders_collection.insert_many(restored, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                raise
+    await orders_archive_collection.delete_many({"id": {"$in": later + stuck_ids}})
+    return len(restored)
+
+
+async def acquire_lease(seconds: float) -> bool:
+    """Take or renew the archive lease for `seconds`; False if another worker holds it."""
+    now = datetime.utcnow()
+    try:
+        await meta_collection.find_one_and_update(
+            {"_id": ARCHIVE_LEASE_ID, "$or": [{"expires_at": {"$lte": now}}, {"owner": ARCHIVE_LEASE_OWNER}]},
+            {"$set": {"owner": ARCHIVE_LEASE_OWNER, "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The lease exists, is unexpired and belongs to someone else
+        return False
+    return True
+
+
+async def archive_periodically() -> None:
+    """Archive old orders every ORDER_ARCHIVE_INTERVAL seconds until cancelled.
+
+    Every worker runs this loop, but only the one holding the lease archives,
+    so at most one run starts per interval (runs longer than the interval
+    can overlap the next, which archive_orders tolerates).
+    """
+    while True:
+        await asyncio.sleep(ORDER_ARCHIVE_INTERVAL)
+        try:
+            if await acquire_lease(ORDER_ARCHIVE_INTERVAL):
+                await archive_orders()
+        except Exception:
+            # Orders left in the hot collection are moved by the next run
+            logger.exception("Order archival failed; retrying in %ss", ORDER_ARCHIVE_INTERVAL)
+
+
+@cli.command()
+def run(
+    months: int = typer.Option(ORDER_ARCHIVE_AFTER_MONTHS, help="Archive orders older than this many months"),
+    batch_size: int = typer.Option(ORDER_ARCHIVE_BATCH_SIZE, help="Orders moved per batch"),
+):
+    """Archive old orders once and report how many moved."""
+    moved = asyncio.run(archive_orders(months, batch_size))
+    typer.echo(f"Archived {moved:,} orders older than {months} months.")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,190 @@
+from collections import OrderedDict
+from typing import Optional
+from pymongo import ReturnDocument
+from database import meta_collection
+import os
+import time
+
+# Catalog cache tuning (per worker process)
+CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', '1024'))
+CATALOG_CACHE_TTL = float(os.environ.get('CATALOG_CACHE_TTL', '60'))
+# Seconds between checks of the shared catalog version stamp; 0 disables the
+# check and leaves cross-worker staleness bounded by the TTL alone
+CATALOG_VERSION_CHECK_INTERVAL = float(os.environ.get('CATALOG_VERSION_CHECK_INTERVAL', '1'))
+# Cache-Control sent with catalog responses; the default makes browsers and
+# proxies revalidate every time, which is cheap thanks to the ETag
+CATALOG_CACHE_CONTROL = os.environ.get('CATALOG_CACHE_CONTROL', 'public, no-cache')
+
+
+class LRUCache:
+    """Bounded LRU mapping whose entries also expire after `ttl` seconds.
+
+    `generation` changes on every clear(); a writer that captured the
+    generation before querying Mongo passes it to set() so a result read
+    before an invalidation is never stored after it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, generation=None, ttl=None) -> None:
+        """Store `value`; `ttl` can shorten (never extend) the default lifetime."""
+        if generation is not None and generation != self.generation:
+            return
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic() + lifetime, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.generation += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class VersionStamp:
+    """Shared change counter stored in the meta collection.
+
+    bump() increments it; sync() reads it at most once per `check_interval`
+    seconds and calls `on_change` when another worker has bumped it. This
+    keeps per-process caches consistent without a shared cache service.
+    """
+
+    def __init__(self, name: str, check_interval: float, on_change):
+        self.name = name
+        self.check_interval = check_interval
+        self.on_change = on_change
+        self.version = None
+        self._checked_at = 0.0
+
+    async def sync(self) -> None:
+        # With checks disabled the stamp is still read once so it is known
+        if self.check_interval <= 0 and self.version is not None:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        stamp = await meta_collection.find_one({"_id": self.name})
+        version = stamp["version"] if stamp else 0
+        if version != self.version:
+            if self.version is not None:
+                self.on_change()
+            self.version = version
+
+    async def bump(self) -> int:
+        stamp = await meta_collection.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.on_change()
+        self.version = stamp["version"]
+        return self.version
+
+
+class CatalogCache:
+    """Product documents and catalog query results for this worker.
+
+    Admin mutations and checkouts call bump(), which clears the local
+    caches and increments the "catalog" version stamp. Other workers notice
+    the new stamp within CATALOG_VERSION_CHECK_INTERVAL seconds and drop
+    their own entries.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, check_interval: float):
+        self.products = LRUCache(maxsize, ttl)
+        self.queries = LRUCache(maxsize, ttl)
+        self.stamp = VersionStamp("catalog", check_interval, self.clear)
+        self.invalidations = 0
+        self.changed_at = float("-inf")
+
+    @property
+    def version(self):
+        return self.stamp.version
+
+    def clear(self) -> None:
+        self.products.clear()
+        self.queries.clear()
+        self.invalidations += 1
+        self.changed_at = time.monotonic()
+
+    def changed_within(self, seconds: float) -> bool:
+        """True if this worker saw a catalog change in the last `seconds`."""
+        return time.monotonic() - self.changed_at < seconds
+
+    async def sync(self) -> None:
+        """Drop local entries if another worker bumped the catalog version."""
+        await self.stamp.sync()
+
+    async def bump(self) -> int:
+        """Record a catalog change for every worker and invalidate locally."""
+        return await self.stamp.bump()
+
+    def etag(self) -> Optional[str]:
+        """Strong validator for catalog responses; call after sync().
+
+        Admin mutations and checkouts change it through the version stamp.
+        It also rolls over every cache TTL, bounding how long writes made
+        outside the API (seed.py, the mongo shell) can go unnoticed. With
+        caching disabled (TTL 0) there is no validator and no 304s.
+        """
+        if self.products.ttl <= 0:
+            return None
+        return f'"catalog-{self.version}-{int(time.time() // self.products.ttl)}"'
+
+    def headers(self) -> dict:
+        etag = self.etag()
+        headers = {"Cache-Control": CATALOG_CACHE_CONTROL}
+        if etag:
+            headers["ETag"] = etag
+        return headers
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "invalidations": self.invalidations,
+            "products": self.products.stats(),
+            "queries": self.queries.stats(),
+        }
+
+
+catalog_cache = CatalogCache(CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL, CATALOG_VERSION_CHECK_INTERVAL)
@@ -0,0 +1,154 @@
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database import products_collection
+import asyncio
+import csv
+import io
+import json
+import os
+import uuid
+
+# Rows validated and written per bulk_write
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '1000'))
+# Row errors kept in the import report; the rest are only counted
+IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get('IMPORT_MAX_REPORTED_ERRORS', '1000'))
+
+FORMATS = ("ndjson", "csv")
+CSV_COLUMNS = ["id", "name", "description", "price", "image_url", "category", "stock", "specifications"]
+
+
+def resolve_format(requested: Optional[str], filename: Optional[str] = None) -> str:
+    """Explicit ?format= wins; otherwise infer from the file extension, defaulting to NDJSON."""
+    if requested is None and filename:
+        requested = "csv" if filename.lower().endswith(".csv") else "ndjson"
+    requested = (requested or "ndjson").lower()
+    if requested not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, expected one of: {', '.join(FORMATS)}")
+    return requested
+
+
+def _read_rows(binary_file, fmt: str) -> Iterator[Tuple[int, Union[dict, str]]]:
+    """Yield (row_number, raw_row) pairs; raw_row is a dict or a parse error string."""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        # Row 1 is the header
+        for row_number, row in enumerate(csv.DictReader(text), start=2):
+            row = {key: value for key, value in row.items() if key and value not in (None, "")}
+            if isinstance(row.get("specifications"), str):
+                try:
+                    row["specifications"] = json.loads(row["specifications"])
+                except ValueError:
+                    yield row_number, "specifications: not valid JSON"
+                    continue
+            yield row_number, row
+    else:
+        for row_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield row_number, "not valid JSON"
+                continue
+            yield row_number, row if isinstance(row, dict) else "expected a JSON object"
+
+
+def _to_update(model, row: dict) -> UpdateOne:
+    product = model(**row).dict()
+    product_id = product.pop("id", None) or str(uuid.uuid4())
+    return UpdateOne({"id": product_id}, {"$set": product, "$setOnInsert": {"id": product_id}}, upsert=True)
+
+
+@dataclass
+class ImportReport:
+    processed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Union[int, str]]] = field(default_factory=list)
+
+    def fail(self, row_number: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    def result(self) -> dict:
+        return {**asdict(self), "errors_truncated": self.failed > len(self.errors)}
+
+
+def _next_chunk(rows: Iterator[Tuple[int, Union[dict, str]]], model,
+                report: ImportReport) -> Tuple[List[UpdateOne], List[int]]:
+    """Read and validate up to IMPORT_CHUNK_SIZE rows into upserts.
+
+    Blocking (file reads, parsing, pydantic), so it runs in a worker thread.
+    Returns empty lists once the rows are exhausted.
+    """
+    operations: List[UpdateOne] = []
+    row_numbers: List[int] = []
+    for row_number, row in islice(rows, IMPORT_CHUNK_SIZE):
+        report.processed += 1
+        if isinstance(row, str):
+            report.fail(row_number, row)
+            continue
+        try:
+            operations.append(_to_update(model, row))
+            row_numbers.append(row_number)
+        except ValidationError as e:
+            report.fail(row_number, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+    return operations, row_numbers
+
+
+async def import_products(binary_file, fmt: str, model) -> dict:
+    """Validate rows with `model` and upsert them by id in unordered chunks.
+
+    Rows without an id are inserted as new products. Invalid rows and rows
+    rejected by Mongo are listed in the report; the rest are still applied.
+    Parsing and validation run off the event loop, one chunk at a time.
+    """
+    report = ImportReport()
+    rows = _read_rows(binary_file, fmt)
+    while True:
+        processed = report.processed
+        operations, row_numbers = await asyncio.to_thread(_next_chunk, rows, model, report)
+        if report.processed == processed:
+            break
+        if not operations:
+            continue
+        try:
+            result = await products_collection.bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for error in details["writeErrors"]:
+                report.fail(row_numbers[error["index"]], error["errmsg"])
+        report.inserted += details["nUpserted"]
+        report.updated += details["nModified"]
+    return report.result()
+
+
+def csv_response(cursor, filename: str) -> StreamingResponse:
+    """Stream products from a Motor cursor as CSV, one driver batch at a time."""
+    async def lines():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        async for product in cursor:
+            product["specifications"] = json.dumps(product.get("specifications") or {})
+            writer.writerow(product)
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        lines(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,308 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+from metrics import command_metrics
+from slow_queries import slow_query_log
+import os
+
+# Database connection
+# Motor drives the same wire protocol as pymongo but yields to the event loop
+# while waiting on the server, so one slow round trip no longer stalls every
+# other request handled by the worker. Every command is reported to the
+# metrics registry, attributed to the route that issued it, and slow reads
+# are recorded in the slow-query log.
+#
+# The client is created on first use inside each worker process (normally
+# from the app's lifespan hook), never at import time, so a client and its
+# monitor threads are never inherited across fork.
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
+MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'techhub_db')
+
+# Pool and timeout tuning; unset values fall back to the connection string
+# and then to the driver defaults. Sized per worker process.
+_CLIENT_OPTIONS = {
+    'maxPoolSize': ('MONGO_MAX_POOL_SIZE', int),
+    'minPoolSize': ('MONGO_MIN_POOL_SIZE', int),
+    'maxIdleTimeMS': ('MONGO_MAX_IDLE_TIME_MS', int),
+    'waitQueueTimeoutMS': ('MONGO_WAIT_QUEUE_TIMEOUT_MS', int),
+    'connectTimeoutMS': ('MONGO_CONNECT_TIMEOUT_MS', int),
+    'socketTimeoutMS': ('MONGO_SOCKET_TIMEOUT_MS', int),
+    'serverSelectionTimeoutMS': ('MONGO_SERVER_SELECTION_TIMEOUT_MS', int),
+    # Comma-separated, in preference order, e.g. "zstd,snappy,zlib"
+    'compressors': ('MONGO_COMPRESSORS', str),
+    'zlibCompressionLevel': ('MONGO_ZLIB_COMPRESSION_LEVEL', int),
+}
+
+
+def client_options() -> dict:
+    """Driver keyword arguments from the MONGO_* environment variables."""
+    options = {}
+    for option, (variable, parse) in _CLIENT_OPTIONS.items():
+        value = os.environ.get(variable)
+        if value:
+            options[option] = parse(value)
+    return options
+
+
+class _Connection:
+    """The process-wide client, created lazily on first use."""
+
+    def __init__(self):
+        self.client = None
+        self.db = None
+
+    def get(self, database_name=None):
+        if self.client is None:
+            self.client = AsyncIOMotorClient(
+                MONGO_URL,
+                event_listeners=[command_metrics, slow_query_log],
+                **client_options()
+            )
+            self.db = self.client[database_name or MONGO_DB_NAME]
+            slow_query_log.attach(self.client.delegate)
+        return self.client
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.forget()
+
+    def forget(self) -> None:
+        self.client = self.db = None
+
+
+_connection = _Connection()
+# A forked child must not reuse the parent's sockets or monitor threads
+os.register_at_fork(after_in_child=_connection.forget)
+
+
+def connect(database_name=None):
+    """Create this process's client if needed; called from the app's lifespan hook.
+
+    `database_name` overrides MONGO_DB_NAME for tools such as seed.py that
+    target another database; it only applies when the client is created.
+    """
+    return _connection.get(database_name)
+
+
+def close() -> None:
+    """Close this process's client; the next use creates a fresh one."""
+    global _transactions_supported
+    _connection.close()
+    _transactions_supported = None
+
+
+def get_client():
+    return _connection.get()
+
+
+def get_database():
+    _connection.get()
+    return _connection.db
+
+
+# Read routing
+# Catalog browsing and admin reports tolerate slightly stale data, so they
+# read through the *_replica_collection handles below, which prefer
+# secondaries and skip any lagging more than REPLICA_MAX_STALENESS_SECONDS
+# (the server requires at least 90). Cart, order and auth paths, and every
+# write, use the plain handles pinned to the primary, so a request always
+# reads its own writes. On a standalone server both resolve to the same
+# node. REPLICA_READ_MODE=primary turns the routing off.
+REPLICA_READ_MODE = os.environ.get('REPLICA_READ_MODE', 'secondaryPreferred')
+REPLICA_MAX_STALENESS_SECONDS = int(os.environ.get('REPLICA_MAX_STALENESS_SECONDS', '90'))
+
+_READ_MODES = {
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+
+PRIMARY_READS = Primary()
+
+
+def replica_read_preference():
+    """Read preference for staleness-tolerant reads, from REPLICA_READ_MODE."""
+    if REPLICA_READ_MODE == 'primary':
+        return PRIMARY_READS
+    if REPLICA_READ_MODE not in _READ_MODES:
+        raise ValueError(f"Unknown REPLICA_READ_MODE {REPLICA_READ_MODE!r}")
+    return _READ_MODES[REPLICA_READ_MODE](max_staleness=REPLICA_MAX_STALENESS_SECONDS)
+
+
+REPLICA_READS = replica_read_preference()
+
+
+class LazyCollection:
+    """Module-level handle that resolves to the collection on the current client.
+
+    Lets other modules keep `from database import products_collection`
+    while the client itself is only created inside the worker. The handle
+    carries the read preference its callers are routed with.
+    """
+
+    def __init__(self, name: str, read_preference=PRIMARY_READS):
+        self.name = name
+        self.read_preference = read_preference
+        self._client = None
+        self._collection = None
+
+    def _resolve(self):
+        client = get_client()
+        if self._client is not client:
+            self._collection = _connection.db.get_collection(self.name, read_preference=self.read_preference)
+            self._client = client
+        return self._collection
+
+    def __getattr__(self, attribute):
+        return getattr(self._resolve(), attribute)
+
+    def __repr__(self) -> str:
+        return f"LazyCollection({self.name!r}, {self.read_preference!r})"
+
+
+# Collections (primary reads)
+users_collection = LazyCollection("users")
+products_collection = LazyCollection("products")
+cart_collection = LazyCollection("cart")
+orders_collection = LazyCollection("orders")
+# Orders moved out of the hot collection by archive.py
+orders_archive_collection = LazyCollection("orders_archive")
+meta_collection = LazyCollection("meta")
+# Hourly/daily sales buckets maintained by rollups.py
+sales_rollups_collection = LazyCollection("sales_rollups")
+revoked_tokens_collection = LazyCollection("revoked_tokens")
+
+# Staleness-tolerant reads for the catalog and admin reports
+users_replica_collection = LazyCollection("users", REPLICA_READS)
+products_replica_collection = LazyCollection("products", REPLICA_READS)
+orders_replica_collection = LazyCollection("orders", REPLICA_READS)
+orders_archive_replica_collection = LazyCollection("orders_archive", REPLICA_READS)
+sales_rollups_replica_collection = LazyCollection("sales_rollups", REPLICA_READS)
+
+# Index registry: collection name -> indexes every query path relies on.
+# Names are fixed so repeated create_indexes calls are no-ops.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "products": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("category", ASCENDING), ("id", ASCENDING)], name="category_id"),
+        IndexModel([("stock", ASCENDING)], name="stock"),
+        IndexModel([("name", ASCENDING)], name="name"),
+        IndexModel(
+            [("name", TEXT), ("description", TEXT), ("category", TEXT)],
+            name="search_text",
+            weights={"name": 10, "category": 5, "description": 1},
+            default_language="english",
+        ),
+    ],
+    "cart": [
+        IndexModel([("user_id", ASCENDING), ("product_id", ASCENDING)], name="user_product_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    # New order ids are UUIDv7 (ids.py), so every orders index below is
+    # appended to at its right edge rather than split at random pages
+    "orders": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="user_created_at_id"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    # Archived orders are only listed per user, by admins and fetched by id;
+    # no status index keeps the archive compact
+    "orders_archive": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="user_created_at_id"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+    ],
+    # One document per (granularity, dimension, key, bucket); the first index
+    # serves the upserts and cross-key range reports, the second one key's series
+    "sales_rollups": [
+        IndexModel(
+            [("granularity", ASCENDING), ("dimension", ASCENDING), ("bucket", ASCENDING), ("key", ASCENDING)],
+            name="granularity_dimension_bucket_key",
+            unique=True,
+        ),
+        IndexModel(
+            [("granularity", ASCENDING), ("dimension", ASCENDING), ("key", ASCENDING), ("bucket", ASCENDING)],
+            name="granularity_dimension_key_bucket",
+        ),
+    ],
+    "revoked_tokens": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at", sparse=True),
+    ],
+}
+
+# Indexes that failed to build at startup, keyed by "collection.name".
+index_errors = {}
+
+
+# Whether the deployment accepts multi-document transactions; probed once
+_transactions_supported = None
+
+
+async def supports_transactions() -> bool:
+    """True when connected to a replica set or sharded cluster."""
+    global _transactions_supported
+    if _transactions_supported is None:
+        hello = await get_client().admin.command("hello")
+        _transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _transactions_supported
+
+
+async def fetch_all(cursor) -> list:
+    """Drain a Motor cursor into a list without blocking the event loop."""
+    return await cursor.to_list(length=None)
+
+
+async def ensure_indexes() -> None:
+    """Create every registered index that does not exist yet.
+
+    A failing index (e.g. duplicates blocking a unique build) is recorded in
+    index_errors instead of aborting startup, and shows up as missing in
+    index_report().
+    """
+    index_errors.clear()
+    for collection_name, indexes in INDEXES.items():
+        collection = get_database()[collection_name]
+        for index in indexes:
+            try:
+                await collection.create_indexes([index])
+            except OperationFailure as e:
+                index_errors[f"{collection_name}.{index.document['name']}"] = str(e)
+
+
+async def index_report() -> dict:
+    """Usage stats for existing indexes and any registered index that is missing."""
+    report = {}
+    for collection_name, indexes in INDEXES.items():
+        collection = get_database()[collection_name]
+        stats = await fetch_all(collection.aggregate([{"$indexStats": {}}]))
+        existing_keys = {tuple(stat["key"].items()) for stat in stats}
+        existing_names = {stat["name"] for stat in stats}
+        missing = []
+        for index in indexes:
+            spec = index.document
+            # Text indexes report an internal _fts key, so also match by name
+            if spec["name"] not in existing_names and tuple(spec["key"].items()) not in existing_keys:
+                error = index_errors.get(f"{collection_name}.{spec['name']}")
+                missing.append({"name": spec["name"], "key": dict(spec["key"]), "error": error})
+        report[collection_name] = {
+            "indexes": [
+                {
+                    "name": stat["name"],
+                    "key": dict(stat["key"]),
+                    "ops": stat["accesses"]["ops"],
+                    "since": stat["accesses"]["since"],
+                }
+                for stat in stats
+            ],
+            "missing": missing,
+        }
+    return report
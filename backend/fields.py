@@ -0,0 +1,51 @@
+from typing import Iterable, Optional, Tuple
+from fastapi import HTTPException
+
+# Fields a client may select with ?fields=a,b,c; "*" selects the full document
+ALL_FIELDS = "*"
+
+PRODUCT_FIELDS = ("id", "name", "description", "price", "image_url", "category", "stock", "specifications")
+ORDER_FIELDS = (
+    "id", "user_id", "total_amount", "status", "created_at",
+    "items", "items.product_id", "items.name", "items.category", "items.price", "items.quantity", "items.total",
+)
+
+# Slim default views for list endpoints
+PRODUCT_SUMMARY = ("id", "name", "price", "image_url", "category", "stock")
+ORDER_SUMMARY = ("id", "status", "total_amount", "created_at", "items.name", "items.quantity", "items.total")
+ADMIN_ORDER_SUMMARY = ("id", "user_id", "status", "total_amount", "created_at")
+
+
+def select_fields(fields: Optional[str], allowed: Tuple[str, ...],
+                  default: Optional[Tuple[str, ...]] = None) -> Optional[Tuple[str, ...]]:
+    """Validate a ?fields= value; None means the full document."""
+    if fields is None:
+        return default
+    if fields.strip() == ALL_FIELDS:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = sorted(requested - set(allowed))
+    if not requested or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested")
+    return tuple(sorted(requested))
+
+
+def build_projection(selected: Optional[Iterable[str]], full: dict, required: Iterable[str] = ()) -> dict:
+    """Mongo projection for `selected` fields plus `required` ones (e.g. sort keys).
+
+    `full` is the projection used when every field is wanted. Sub-paths of a
+    field that is selected whole are dropped, since Mongo rejects overlapping
+    paths such as {"items": 1, "items.name": 1}.
+    """
+    if selected is None:
+        return dict(full)
+    paths = set(selected) | set(required)
+    paths = {path for path in paths if path.split(".")[0] == path or path.split(".")[0] not in paths}
+    return {"_id": 0, **{path: 1 for path in sorted(paths)}}
+
+
+def pick(document: dict, selected: Optional[Iterable[str]]) -> dict:
+    """Apply top-level field selection to an already loaded document."""
+    if selected is None:
+        return document
+    return {field: document[field] for field in selected if field in document}
@@ -0,0 +1,44 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def uuid7(timestamp_ms: int = None, random_bits: int = None) -> str:
+    """RFC 9562 UUIDv7 string: a 48-bit Unix millisecond timestamp, then random bits.
+
+    Canonical strings of these ids sort by creation time, so new keys land at
+    the right edge of their indexes instead of at random pages. Within one
+    millisecond the 12-bit rand_a field counts up, keeping ids from one
+    process strictly increasing. Pass `timestamp_ms` and `random_bits` (74
+    bits) to build a deterministic id for a given time, e.g. when seeding.
+    """
+    global _last_ms, _sequence
+    if timestamp_ms is None:
+        with _lock:
+            ms = time.time_ns() // 1_000_000
+            if ms > _last_ms:
+                _last_ms, _sequence = ms, 0
+            else:
+                # Same millisecond, or the clock stepped back: keep counting
+                _sequence += 1
+                if _sequence > 0xFFF:
+                    _last_ms, _sequence = _last_ms + 1, 0
+            ms, sequence = _last_ms, _sequence
+        rand_b = int.from_bytes(os.urandom(8), "big")
+    else:
+        ms = timestamp_ms
+        sequence = random_bits >> 62
+        rand_b = random_bits
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | (sequence & 0xFFF) << 64
+        | 0b10 << 62
+        | (rand_b & 0x3FFF_FFFF_FFFF_FFFF)
+    )
+    return str(uuid.UUID(int=value))
@@ -0,0 +1,239 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from pymongo import monitoring
+from starlette.routing import Match
+import threading
+import time
+
+# Histogram upper bounds (seconds) for request and Mongo command latency
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Mongo commands issued per request; N+1 query patterns land in the top buckets
+COMMANDS_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+# Documents returned per Mongo command
+DOCUMENTS_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000)
+
+# Route label for requests no route matched, and for Mongo commands issued
+# outside a request (startup, background tasks)
+UNMATCHED_ROUTE = "unmatched"
+NO_ROUTE = "none"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Prometheus-style histogram with fixed bucket bounds."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str):
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class RequestScope:
+    """Per-request state the command listener reports into."""
+
+    __slots__ = ("route", "commands")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.commands = 0
+
+
+# Set by the middleware for the duration of each request. Motor runs pymongo
+# calls with a copy of the caller's context, so command events see it too.
+current_request: ContextVar[Optional[RequestScope]] = ContextVar("current_request", default=None)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Registry:
+    """Request and Mongo command metrics for this worker process.
+
+    Command events arrive on Motor's executor threads, so every update takes
+    the lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight: Dict[Tuple[str, str], int] = {}
+        self.commands_per_request: Dict[Tuple[str, str], Histogram] = {}
+        self.command_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.command_documents: Dict[Tuple[str, str], Histogram] = {}
+        self.command_failures: Dict[Tuple[str, str], int] = {}
+
+    def request_started(self, method: str, route: str) -> None:
+        with self.lock:
+            self.in_flight[method, route] = self.in_flight.get((method, route), 0) + 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, commands: int) -> None:
+        key = (method, route)
+        with self.lock:
+            self.in_flight[key] -= 1
+            self.requests[method, route, status] = self.requests.get((method, route, status), 0) + 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.commands_per_request[key] = Histogram(COMMANDS_PER_REQUEST_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.commands_per_request[key].observe(commands)
+
+    def command_finished(self, route: str, command: str, seconds: float, documents: Optional[int]) -> None:
+        key = (route, command)
+        with self.lock:
+            if key not in self.command_latency:
+                self.command_latency[key] = Histogram(LATENCY_BUCKETS)
+                self.command_documents[key] = Histogram(DOCUMENTS_BUCKETS)
+            self.command_latency[key].observe(seconds)
+            if documents is not None:
+                self.command_documents[key].observe(documents)
+
+    def command_failed(self, route: str, command: str) -> None:
+        with self.lock:
+            self.command_failures[route, command] = self.command_failures.get((route, command), 0) + 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            family("http_requests_total", "counter", "HTTP requests by route template and status.")
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+
+            family("http_requests_in_flight", "gauge", "HTTP requests currently being handled.")
+            for (method, route), count in sorted(self.in_flight.items()):
+                lines.append(f'http_requests_in_flight{{method="{method}",route="{_label(route)}"}} {count}')
+
+            family("http_request_duration_seconds", "histogram", "HTTP request latency.")
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines.extend(histogram.samples("http_request_duration_seconds", f'method="{method}",route="{_label(route)}"'))
+
+            family("http_request_mongo_commands", "histogram", "Mongo commands issued per HTTP request.")
+            for (method, route), histogram in sorted(self.commands_per_request.items()):
+                lines.extend(histogram.samples("http_request_mongo_commands", f'method="{method}",route="{_label(route)}"'))
+
+            family("mongo_command_duration_seconds", "histogram", "Mongo command latency by issuing route.")
+            for (route, command), histogram in sorted(self.command_latency.items()):
+                lines.extend(histogram.samples("mongo_command_duration_seconds", f'route="{_label(route)}",command="{command}"'))
+
+            family("mongo_command_documents", "histogram", "Documents returned per Mongo command by issuing route.")
+            for (route, command), histogram in sorted(self.command_documents.items()):
+                lines.extend(histogram.samples("mongo_command_documents", f'route="{_label(route)}",command="{command}"'))
+
+            family("mongo_command_failures_total", "counter", "Failed Mongo commands by issuing route.")
+            for (route, command), count in sorted(self.command_failures.items()):
+                lines.append(f'mongo_command_failures_total{{route="{_label(route)}",command="{command}"}} {count}')
+
+            family("process_start_time_seconds", "gauge", "Start time of the worker process.")
+            lines.append(f"process_start_time_seconds {self.started_at}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _documents_returned(reply: dict) -> Optional[int]:
+    """Documents in a command reply, or None for commands that return none."""
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if "value" in reply:  # findAndModify
+        return int(reply["value"] is not None)
+    return None
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Attributes Mongo commands to the route whose request issued them."""
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        scope = current_request.get()
+        if scope is not None:
+            scope.commands += 1
+        registry.command_finished(
+            scope.route if scope else NO_ROUTE,
+            event.command_name,
+            event.duration_micros / 1e6,
+            _documents_returned(event.reply),
+        )
+
+    def failed(self, event) -> None:
+        scope = current_request.get()
+        if scope is not None:
+            scope.commands += 1
+        registry.command_failed(scope.route if scope else NO_ROUTE, event.command_name)
+
+
+command_metrics = CommandMetrics()
+
+
+def route_template(scope) -> str:
+    """Path template of the route that will handle this request, e.g. /api/products/{product_id}."""
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Records latency, status and in-flight counts per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        request_scope = RequestScope(route)
+        token = current_request.set(request_scope)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.request_started(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.request_finished(method, route, status, time.perf_counter() - started, request_scope.commands)
+            current_request.reset(token)
@@ -0,0 +1,144 @@
+import base64
+from typing import Awaitable, Callable, List, Optional, Tuple
+from datetime import datetime
+from bson.json_util import dumps, loads
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+from responses import dumps as dumps_json, json_response
+
+# Page size used when a client does not ask for one, and the upper bound
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Documents pulled from Mongo per round trip while streaming
+STREAM_BATCH_SIZE = 500
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Types a sort-key value in a cursor may have
+CURSOR_VALUE_TYPES = (str, int, float, datetime)
+
+
+def encode_cursor(document: dict, sort: List[Tuple[str, int]]) -> str:
+    """Opaque token holding the sort-key values of the last document on a page."""
+    values = [document[field] for field, _ in sort]
+    return base64.urlsafe_b64encode(dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token: str, sort: List[Tuple[str, int]]) -> list:
+    # Cursors come from clients, and extended JSON decoding of a crafted token
+    # can fail in many ways (TypeError, IndexError, ...); all of them are a 400
+    try:
+        values = loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Only plain sort-key values; a dict would be read as query operators
+    if not all(isinstance(value, CURSOR_VALUE_TYPES) and not isinstance(value, bool) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def keyset_filter(sort: List[Tuple[str, int]], values: list) -> dict:
+    """Filter matching documents strictly after `values` in `sort` order.
+
+    For sort [(a, -1), (b, -1)] this is
+    {"$or": [{a: {"$lt": va}}, {a: va, b: {"$lt": vb}}]}.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def after_cursor(query: dict, sort: List[Tuple[str, int]], cursor: Optional[str]) -> dict:
+    """Narrow `query` to documents after `cursor`; returns `query` unchanged without one."""
+    if not cursor:
+        return query
+    after = keyset_filter(sort, decode_cursor(cursor, sort))
+    return {"$and": [query, after]} if query else after
+
+
+def partitions(collection) -> tuple:
+    """A collection, or a sequence of collections partitioned in sort order.
+
+    With a sequence such as (orders, orders_archive) every document in one
+    partition sorts before every document in the next, so pages and streams
+    simply continue from one into the next.
+    """
+    return tuple(collection) if isinstance(collection, (list, tuple)) else (collection,)
+
+
+async def fetch_page(collection, query: dict, sort: List[Tuple[str, int]], limit: int,
+                     cursor: Optional[str] = None, projection: Optional[dict] = None):
+    """Return (documents, next_cursor) for one keyset page.
+
+    The last sort key must be unique (e.g. "id") so pages never overlap.
+    One extra document is fetched to decide whether a next page exists.
+    `collection` may be a sequence of partitions (see partitions()).
+    """
+    query = after_cursor(query, sort, cursor)
+    documents = []
+    seen = set()
+    for partition in partitions(collection):
+        wanted = limit + 1 - len(documents)
+        if wanted <= 0:
+            break
+        for document in await partition.find(query, projection).sort(sort).limit(wanted).to_list(length=None):
+            # A document being moved between partitions can briefly be in both
+            key = tuple(document[field] for field, _ in sort)
+            if key not in seen:
+                seen.add(key)
+                documents.append(document)
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], sort)
+    return documents, next_cursor
+
+
+def cursor_headers(next_cursor: Optional[str]) -> dict:
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+
+async def paginated_response(collection, query: dict, sort: List[Tuple[str, int]], limit: int,
+                             cursor: Optional[str] = None, projection: Optional[dict] = None) -> Response:
+    """One page as a JSON response, with the next-page cursor in its header."""
+    documents, next_cursor = await fetch_page(collection, query, sort, limit, cursor, projection)
+    return json_response(documents, cursor_headers(next_cursor))
+
+
+def ndjson_response(collection, query: dict, sort: List[Tuple[str, int]],
+                    cursor: Optional[str] = None, projection: Optional[dict] = None,
+                    transform: Optional[Callable[[List[dict]], Awaitable[None]]] = None) -> StreamingResponse:
+    """Stream every matching document as NDJSON straight off the Mongo cursor.
+
+    Only one driver batch is held in memory at a time, so exports cost the
+    same regardless of collection size. `collection` may be a sequence of
+    partitions (see partitions()), streamed one after the other. `transform`,
+    if given, is awaited on each batch of documents before it is written and
+    may modify them in place.
+    """
+    query = after_cursor(query, sort, cursor)
+
+    async def encode(batch: List[dict]) -> bytes:
+        if transform is not None:
+            await transform(batch)
+        return b"\n".join(dumps_json(document) for document in batch) + b"\n"
+
+    async def lines():
+        batch = []
+        for partition in partitions(collection):
+            async for document in partition.find(query, projection).sort(sort).batch_size(STREAM_BATCH_SIZE):
+                batch.append(document)
+                if len(batch) == STREAM_BATCH_SIZE:
+                    yield await encode(batch)
+                    batch = []
+        if batch:
+            yield await encode(batch)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
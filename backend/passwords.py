@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException
+import asyncio
+import bcrypt
+import os
+
+# bcrypt work factor for new hashes; stored hashes with a different cost are
+# rehashed on the next successful login
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+# Threads doing bcrypt work (bcrypt releases the GIL while hashing)
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2)))
+# Hash/verify calls allowed to wait for a worker before new ones get 503
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '64'))
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+# Calls submitted and not finished: up to PASSWORD_HASH_WORKERS of them are
+# running, the rest wait in the executor's queue
+_pending = 0
+
+
+async def _run_in_pool(fn, *args):
+    """Run a bcrypt call off the event loop, shedding load once the queue is full."""
+    global _pending
+    # Shed only when every worker is busy and the queue is already full
+    if _pending - PASSWORD_HASH_WORKERS >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication is busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+async def hash_password(password: str) -> str:
+    return await _run_in_pool(_hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _run_in_pool(_verify, password, hashed)
+
+
+async def rehash_password(password: str) -> Optional[str]:
+    """Hash for a cost upgrade, or None when no bcrypt worker is idle.
+
+    Upgrades are optional, so they never queue behind (or get a 503 ahead
+    of) logins and sign-ups; the next login simply tries again.
+    """
+    if _pending >= PASSWORD_HASH_WORKERS:
+        return None
+    try:
+        return await _run_in_pool(_hash, password)
+    except HTTPException:
+        return None
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True if a stored "$2b$<cost>$..." hash uses a different cost than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
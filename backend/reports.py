@@ -0,0 +1,424 @@
+"""Vectorized sales reports and columnar order exports.
+
+Orders and archived orders are streamed from the replicas in batches of
+REPORT_BATCH_SIZE, flattened into NumPy columns and folded into running
+aggregates, so memory grows with the number of products, users and months
+rather than with the number of orders.
+
+    python reports.py summary --start 2025-01-01 --limit 20
+    python reports.py export items.parquet --table items --format parquet
+"""
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from database import orders_replica_collection, orders_archive_replica_collection
+from rollups import EXCLUDED_STATUSES, UNCATEGORIZED
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+import typer
+
+# Orders decoded, flattened and folded per step
+REPORT_BATCH_SIZE = int(os.environ.get('REPORT_BATCH_SIZE', '20000'))
+# Baskets with more units (or lines) than this share the histogram's last bin
+REPORT_MAX_BASKET = int(os.environ.get('REPORT_MAX_BASKET', '50'))
+
+REPORT_PARTITIONS = (orders_archive_replica_collection, orders_replica_collection)
+REPORT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "user_id": 1,
+    "created_at": 1,
+    "status": 1,
+    "total_amount": 1,
+    "items.product_id": 1,
+    "items.name": 1,
+    "items.category": 1,
+    "items.price": 1,
+    "items.quantity": 1,
+    "items.total": 1,
+}
+
+TABLES = ("orders", "items")
+ORDER_COLUMNS = ["id", "user_id", "created_at", "status", "total_amount", "lines", "units"]
+ITEM_COLUMNS = ["order_id", "user_id", "created_at", "status", "product_id", "name", "category", "price", "quantity", "total"]
+EXPORT_FORMATS = {
+    # format: (file suffix, media type)
+    "csv": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+cli = typer.Typer(add_completion=False)
+
+
+def to_frames(documents: List[dict]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Flatten order documents into an orders frame and an order-items frame."""
+    count = len(documents)
+    items = [item for order in documents for item in order["items"]]
+    lines = np.fromiter((len(order["items"]) for order in documents), dtype=np.int64, count=count)
+    quantity = np.fromiter((item["quantity"] for item in items), dtype=np.int64, count=len(items))
+
+    order_ids = np.array([order["id"] for order in documents], dtype=object)
+    user_ids = np.array([order["user_id"] for order in documents], dtype=object)
+    statuses = np.array([order.get("status") for order in documents], dtype=object)
+    # pandas parses datetime objects an order of magnitude faster than np.array
+    created_at = pd.DatetimeIndex([order["created_at"] for order in documents]).to_numpy()
+    # Position of each item's order, used to broadcast order columns onto items
+    owner = np.repeat(np.arange(count), lines)
+
+    orders = pd.DataFrame({
+        "id": order_ids,
+        "user_id": user_ids,
+        "created_at": created_at,
+        "status": statuses,
+        "total_amount": np.fromiter((order["total_amount"] for order in documents), dtype=np.float64, count=count),
+        "lines": lines,
+        "units": np.bincount(owner, weights=quantity, minlength=count).astype(np.int64),
+    })
+    order_items = pd.DataFrame({
+        "order_id": order_ids[owner],
+        "user_id": user_ids[owner],
+        "created_at": created_at[owner],
+        "status": statuses[owner],
+        "product_id": np.array([item["product_id"] for item in items], dtype=object),
+        "name": np.array([item.get("name") for item in items], dtype=object),
+        "category": np.array([item.get("category") or UNCATEGORIZED for item in items], dtype=object),
+        "price": np.fromiter((item["price"] for item in items), dtype=np.float64, count=len(items)),
+        "quantity": quantity,
+        "total": np.fromiter((item["total"] for item in items), dtype=np.float64, count=len(items)),
+    })
+    return orders, order_items
+
+
+def month_label(month: int) -> str:
+    """Months since 1970-01 as "YYYY-MM"."""
+    return f"{1970 + month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def distribution(histogram: np.ndarray) -> dict:
+    """Mean and nearest-rank percentiles of a histogram whose last bin is open-ended."""
+    total = int(histogram.sum())
+    if not total:
+        return {"mean": 0.0, "p50": 0, "p90": 0, "p99": 0, "histogram": []}
+    cumulative = np.cumsum(histogram)
+    percentiles = {
+        f"p{pct}": int(np.searchsorted(cumulative, np.ceil(pct / 100 * total)))
+        for pct in (50, 90, 99)
+    }
+    # Trailing empty bins are dropped; the mean treats the last bin as its lower bound
+    last = int(np.flatnonzero(histogram)[-1])
+    return {
+        "mean": round(float(np.dot(np.arange(len(histogram)), histogram) / total), 3),
+        **percentiles,
+        "histogram": histogram[:last + 1].tolist(),
+    }
+
+
+class KeyCodes:
+    """Dense integer codes for string keys, stable across batches."""
+
+    def __init__(self):
+        self.keys = pd.Index([], dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def encode(self, values: np.ndarray) -> np.ndarray:
+        codes = self.keys.get_indexer(values)
+        unseen = codes < 0
+        if unseen.any():
+            self.keys = self.keys.append(pd.Index(pd.unique(values[unseen])))
+            codes[unseen] = self.keys.get_indexer(values[unseen])
+        return codes
+
+
+def _accumulate(totals: np.ndarray, codes: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    """totals[code] += weight for every pair, growing totals to `size`."""
+    sums = np.bincount(codes, weights=weights, minlength=size)
+    grown = np.zeros(size, dtype=totals.dtype)
+    grown[:len(totals)] = totals
+    return grown + sums.astype(totals.dtype)
+
+
+# Months since 1970 stay below this until the year 2311
+_MONTHS = 4096
+
+
+class SalesReport:
+    """Running aggregates over batches of orders.
+
+    Products and users are mapped to integer codes so every total is a
+    NumPy array updated with bincount. Revenue is kept per (user, month)
+    and cohorts are derived from it when the report is read; a user's
+    cohort is the month of their first order in the range.
+    """
+
+    def __init__(self, max_basket: int = REPORT_MAX_BASKET):
+        self.orders = 0
+        self.revenue = 0.0
+        self.products = KeyCodes()
+        self.product_names = np.empty(0, dtype=object)
+        self.product_revenue = np.zeros(0)
+        self.product_units = np.zeros(0, dtype=np.int64)
+        self.product_orders = np.zeros(0, dtype=np.int64)
+        self.users = KeyCodes()
+        # Sorted user_code * _MONTHS + month keys and the revenue for each
+        self.user_month_keys = np.zeros(0, dtype=np.int64)
+        self.user_month_revenue = np.zeros(0)
+        self.units_histogram = np.zeros(max_basket + 1, dtype=np.int64)
+        self.lines_histogram = np.zeros(max_basket + 1, dtype=np.int64)
+
+    def add(self, documents: List[dict]) -> None:
+        """Fold in a batch of order documents.
+
+        Only the columns the report needs are extracted; to_frames() builds
+        the full tables for exports.
+        """
+        if not documents:
+            return
+        count = len(documents)
+        items = [item for order in documents for item in order["items"]]
+        lines = np.fromiter((len(order["items"]) for order in documents), dtype=np.int64, count=count)
+        quantity = np.fromiter((item["quantity"] for item in items), dtype=np.int64, count=len(items))
+        total_amount = np.fromiter((order["total_amount"] for order in documents), dtype=np.float64, count=count)
+        units = np.bincount(np.repeat(np.arange(count), lines), weights=quantity, minlength=count).astype(np.int64)
+
+        self.orders += count
+        self.revenue += float(total_amount.sum())
+
+        max_basket = len(self.units_histogram) - 1
+        for histogram, values in ((self.units_histogram, units), (self.lines_histogram, lines)):
+            histogram += np.bincount(np.minimum(values, max_basket), minlength=max_basket + 1)
+
+        codes = self.products.encode(np.array([item["product_id"] for item in items], dtype=object))
+        size = len(self.products)
+        totals = np.fromiter((item["total"] for item in items), dtype=np.float64, count=len(items))
+        self.product_revenue = _accumulate(self.product_revenue, codes, totals, size)
+        self.product_units = _accumulate(self.product_units, codes, quantity, size)
+        self.product_orders = _accumulate(self.product_orders, codes, None, size)
+        names = np.empty(size, dtype=object)
+        names[:len(self.product_names)] = self.product_names
+        # Fancy assignment keeps the last name seen for each product
+        names[codes] = [item.get("name") for item in items]
+        self.product_names = names
+
+        created_at = pd.DatetimeIndex([order["created_at"] for order in documents]).to_numpy()
+        months = created_at.astype("datetime64[M]").astype(np.int64)
+        user_ids = np.array([order["user_id"] for order in documents], dtype=object)
+        keys = self.users.encode(user_ids).astype(np.int64) * _MONTHS + months
+        keys, inverse = np.unique(np.concatenate([self.user_month_keys, keys]), return_inverse=True)
+        weights = np.concatenate([self.user_month_revenue, total_amount])
+        self.user_month_keys = keys
+        self.user_month_revenue = np.bincount(inverse, weights=weights, minlength=len(keys))
+
+    def top_products(self, limit: int) -> List[dict]:
+        # Highest revenue first; ties keep first-seen order
+        top = np.argsort(-self.product_revenue, kind="stable")[:limit]
+        return [
+            {"product_id": self.products.keys[code], "name": self.product_names[code],
+             "revenue": round(float(self.product_revenue[code]), 2), "units": int(self.product_units[code]),
+             "orders": int(self.product_orders[code])}
+            for code in top
+        ]
+
+    def cohorts(self) -> List[dict]:
+        """Per first-order month: cohort size, then active users and revenue for each month since."""
+        if not len(self.user_month_keys):
+            return []
+        users, months = np.divmod(self.user_month_keys, _MONTHS)
+        # Keys are sorted, so each user's first entry holds their first month
+        first = np.zeros(len(self.users), dtype=np.int64)
+        starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+        first[users[starts]] = months[starts]
+        cohorts = first[users]
+        offsets = months - cohorts
+
+        width = int(offsets.max()) + 1
+        cells = (cohorts - cohorts.min()) * width + offsets
+        size = (int(cohorts.max() - cohorts.min()) + 1) * width
+        active = np.bincount(cells, minlength=size).reshape(-1, width)
+        revenue = np.bincount(cells, weights=self.user_month_revenue, minlength=size).reshape(-1, width)
+
+        rows = []
+        for row, cohort in enumerate(range(int(cohorts.min()), int(cohorts.max()) + 1)):
+            if not active[row, 0]:
+                continue
+            # A cohort can be followed for as many months as remain in the data
+            span = int(months.max()) - cohort + 1
+            rows.append({
+                "cohort": month_label(cohort),
+                "users": int(active[row, 0]),
+                "active_users": active[row, :span].tolist(),
+                "revenue": np.round(revenue[row, :span], 2).tolist(),
+            })
+        return rows
+
+    def result(self, limit: int = 20) -> dict:
+        return {
+            "orders": self.orders,
+            "revenue": round(self.revenue, 2),
+            "top_products": self.top_products(limit),
+            "basket_size": {
+                "units": distribution(self.units_histogram),
+                "lines": distribution(self.lines_histogram),
+            },
+            "cohorts": self.cohorts(),
+        }
+
+
+def _query(start: Optional[datetime], end: Optional[datetime], include_cancelled: bool) -> dict:
+    query = {} if include_cancelled else {"status": {"$nin": list(EXCLUDED_STATUSES)}}
+    if start or end:
+        query["created_at"] = {}
+        if start:
+            query["created_at"]["$gte"] = start
+        if end:
+            query["created_at"]["$lt"] = end
+    return query
+
+
+async def order_batches(query: dict, batch_size: int = REPORT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """Yield lists of up to `batch_size` orders from the archive, then the hot collection."""
+    for collection in REPORT_PARTITIONS:
+        batch = []
+        async for order in collection.find(query, REPORT_PROJECTION).batch_size(batch_size):
+            batch.append(order)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+async def sales_report(start: Optional[datetime] = None, end: Optional[datetime] = None, limit: int = 20,
+                       batch_size: int = REPORT_BATCH_SIZE) -> dict:
+    """Top products, basket sizes and monthly cohorts for orders placed in [start, end)."""
+    report = SalesReport()
+    async for documents in order_batches(_query(start, end, include_cancelled=False), batch_size):
+        # Folding is CPU bound; keep it off the event loop
+        await asyncio.to_thread(report.add, documents)
+    return await asyncio.to_thread(report.result, limit)
+
+
+def resolve_export(table: str, fmt: str) -> None:
+    if table not in TABLES:
+        raise HTTPException(status_code=400, detail=f"table must be one of: {', '.join(TABLES)}")
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+
+class _CsvWriter:
+    def __init__(self, path: str, columns: List[str]):
+        self.file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self.columns = columns
+        self.header = True
+
+    def write(self, frame: pd.DataFrame) -> None:
+        frame.to_csv(self.file, columns=self.columns, header=self.header, index=False, date_format="%Y-%m-%dT%H:%M:%S.%f")
+        self.header = False
+
+    def close(self) -> None:
+        if self.header:
+            # No rows: still send the header so the file is a valid empty table
+            self.file.write(",".join(self.columns) + "\n")
+        self.file.close()
+
+
+class _ArrowWriter:
+    """Parquet row groups or Arrow IPC record batches, one per order batch."""
+
+    def __init__(self, path: str, columns: List[str], fmt: str):
+        types = {
+            "created_at": pyarrow.timestamp("ms"),
+            "total_amount": pyarrow.float64(), "price": pyarrow.float64(), "total": pyarrow.float64(),
+            "lines": pyarrow.int64(), "units": pyarrow.int64(), "quantity": pyarrow.int64(),
+        }
+        self.schema = pyarrow.schema([(column, types.get(column, pyarrow.string())) for column in columns])
+        if fmt == "parquet":
+            self.writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            self.writer = pyarrow.ipc.new_file(path, self.schema)
+
+    def write(self, frame: pd.DataFrame) -> None:
+        self.writer.write_table(pyarrow.Table.from_pandas(frame, schema=self.schema, preserve_index=False))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+async def export(path: str, table: str = "items", fmt: str = "csv", start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, batch_size: int = REPORT_BATCH_SIZE) -> int:
+    """Write orders or order items (all statuses) to `path`; returns rows written."""
+    resolve_export(table, fmt)
+    columns = ORDER_COLUMNS if table == "orders" else ITEM_COLUMNS
+    writer = _CsvWriter(path, columns) if fmt == "csv" else _ArrowWriter(path, columns, fmt)
+
+    def write(documents: List[dict]) -> int:
+        orders, items = to_frames(documents)
+        frame = orders if table == "orders" else items
+        writer.write(frame[columns])
+        return len(frame)
+
+    rows = 0
+    try:
+        async for documents in order_batches(_query(start, end, include_cancelled=True), batch_size):
+            rows += await asyncio.to_thread(write, documents)
+    finally:
+        writer.close()
+    return rows
+
+
+async def export_response(table: str, fmt: str, start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> FileResponse:
+    """Export into a temporary file, send it, then delete it."""
+    resolve_export(table, fmt)
+    suffix, media_type = EXPORT_FORMATS[fmt]
+    descriptor, path = tempfile.mkstemp(prefix="report-", suffix=suffix)
+    os.close(descriptor)
+    try:
+        await export(path, table, fmt, start, end)
+    except BaseException:
+        os.remove(path)
+        raise
+    return FileResponse(path, media_type=media_type, filename=f"orders-{table}{suffix}",
+                        background=BackgroundTask(os.remove, path))
+
+
+@cli.command()
+def summary(
+    start: Optional[datetime] = typer.Option(None, help="First order time to include (default: all history)"),
+    end: Optional[datetime] = typer.Option(None, help="Include orders placed before this time (default: no limit)"),
+    limit: int = typer.Option(20, help="Top products to list"),
+    batch_size: int = typer.Option(REPORT_BATCH_SIZE, help="Orders per batch"),
+):
+    """Print the sales report as JSON."""
+    report = asyncio.run(sales_report(start, end, limit, batch_size))
+    typer.echo(json.dumps(report, indent=2))
+
+
+@cli.command(name="export")
+def export_command(
+    path: str = typer.Argument(..., help="Output file"),
+    table: str = typer.Option("items", help="orders or items"),
+    fmt: str = typer.Option("csv", "--format", help="csv (gzip), parquet or arrow"),
+    start: Optional[datetime] = typer.Option(None, help="First order time to include (default: all history)"),
+    end: Optional[datetime] = typer.Option(None, help="Include orders placed before this time (default: no limit)"),
+    batch_size: int = typer.Option(REPORT_BATCH_SIZE, help="Orders per batch"),
+):
+    """Export orders or order items to a columnar file."""
+    rows = asyncio.run(export(path, table, fmt, start, end, batch_size))
+    typer.echo(f"Wrote {rows:,} {table} rows to {path}.")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,50 @@
+from typing import Optional
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse, Response
+import orjson
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """orjson encoding used for every response; datetimes become ISO 8601."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class for the app."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def json_response(content, headers=None) -> Response:
+    """Respond without FastAPI's jsonable_encoder pass over the payload.
+
+    `content` is plain data straight from Mongo (projected without _id) or
+    bytes that were already encoded, e.g. a cached page.
+    """
+    if isinstance(content, bytes):
+        return Response(content, media_type="application/json", headers=headers)
+    return FastJSONResponse(content, headers=headers)
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-None-Match check using weak comparison, as RFC 9110 requires for GET.
+
+    A response without an ETag never matches.
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,264 @@
+"""Hourly and daily sales rollups per product, per category and shop-wide.
+
+create_order and update_order_status keep the buckets current. Rebuild a
+range (or all history) from the orders and their archive with:
+
+    python rollups.py --start 2025-01-01 --end 2025-07-01
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from database import (
+    products_collection,
+    orders_collection,
+    orders_archive_collection,
+    sales_rollups_collection,
+    sales_rollups_replica_collection,
+    fetch_all,
+)
+import asyncio
+import logging
+import os
+import typer
+
+logger = logging.getLogger(__name__)
+
+# Orders read and rollup deltas written per round trip during a backfill
+ROLLUP_BACKFILL_BATCH_SIZE = int(os.environ.get('ROLLUP_BACKFILL_BATCH_SIZE', '2000'))
+# Range used by the admin endpoints when no start is given
+ROLLUP_DEFAULT_RANGE = timedelta(days=90)
+
+GRANULARITIES = ("hour", "day")
+# "total" has a single key, "all", so whole-shop order counts are exact
+# (an order spanning two categories counts once in each category)
+DIMENSIONS = ("product", "category", "total")
+TOTAL_KEY = "all"
+# Orders in these statuses contribute nothing to the rollups
+EXCLUDED_STATUSES = ("cancelled",)
+UNCATEGORIZED = "uncategorized"
+
+# Order fields the rollups are computed from
+ORDER_ROLLUP_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "created_at": 1,
+    "status": 1,
+    "items.product_id": 1,
+    "items.name": 1,
+    "items.category": 1,
+    "items.quantity": 1,
+    "items.total": 1,
+}
+
+cli = typer.Typer(add_completion=False)
+
+BucketKey = Tuple[str, str, str, datetime]
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == "day" else moment
+
+
+def counted(status: Optional[str]) -> bool:
+    """Whether an order in this status is included in the rollups."""
+    return status not in EXCLUDED_STATUSES
+
+
+def order_deltas(order: dict, sign: int, deltas: Dict[BucketKey, dict]) -> None:
+    """Add one order's contribution (sign=-1 to remove it) to `deltas`."""
+    touched = set()
+    for granularity in GRANULARITIES:
+        bucket = truncate(order["created_at"], granularity)
+        for item in order["items"]:
+            for dimension, key in (
+                ("product", item["product_id"]),
+                ("category", item.get("category") or UNCATEGORIZED),
+                ("total", TOTAL_KEY),
+            ):
+                bucket_key = (granularity, dimension, key, bucket)
+                delta = deltas.setdefault(bucket_key, {"revenue": 0.0, "orders": 0, "units": 0, "name": None})
+                delta["revenue"] += sign * item["total"]
+                delta["units"] += sign * item["quantity"]
+                if dimension == "product":
+                    delta["name"] = item.get("name")
+                touched.add(bucket_key)
+    # An order counts once per bucket, however many of its items land there
+    for bucket_key in touched:
+        deltas[bucket_key]["orders"] += sign
+
+
+async def resolve_categories(orders: Iterable[dict]) -> None:
+    """Fill in item categories for orders placed before items recorded them."""
+    missing = {item["product_id"] for order in orders for item in order["items"] if "category" not in item}
+    if not missing:
+        return
+    products = await fetch_all(products_collection.find(
+        {"id": {"$in": list(missing)}}, {"_id": 0, "id": 1, "category": 1}
+    ))
+    categories = {product["id"]: product["category"] for product in products}
+    for order in orders:
+        for item in order["items"]:
+            item.setdefault("category", categories.get(item["product_id"], UNCATEGORIZED))
+
+
+async def apply_deltas(deltas: Dict[BucketKey, dict]) -> None:
+    """Upsert every bucket in one unordered bulk write."""
+    if not deltas:
+        return
+    operations = []
+    for (granularity, dimension, key, bucket), delta in deltas.items():
+        update = {"$inc": {"revenue": delta["revenue"], "orders": delta["orders"], "units": delta["units"]}}
+        if delta["name"] is not None:
+            update["$set"] = {"name": delta["name"]}
+        operations.append(UpdateOne(
+            {"granularity": granularity, "dimension": dimension, "key": key, "bucket": bucket},
+            update,
+            upsert=True
+        ))
+    await sales_rollups_collection.bulk_write(operations, ordered=False)
+
+
+async def record_orders(orders: List[dict], sign: int = 1) -> None:
+    """Add (or with sign=-1 remove) orders' sales to their buckets."""
+    await resolve_categories(orders)
+    deltas = {}
+    for order in orders:
+        order_deltas(order, sign, deltas)
+    await apply_deltas(deltas)
+
+
+async def record_order(order: dict) -> None:
+    """Add a just-placed order to its buckets.
+
+    The order is already committed, so a failure is logged rather than
+    raised; a backfill of the range repairs the buckets.
+    """
+    try:
+        await record_orders([order])
+    except Exception:
+        logger.exception("Could not record order %s in the sales rollups", order["id"])
+
+
+async def record_status_change(order: dict, new_status: str) -> None:
+    """Adjust the rollups for an order moving from order["status"] to `new_status`.
+
+    Best-effort like record_order: the status update is already committed.
+    """
+    was_counted, is_counted = counted(order.get("status")), counted(new_status)
+    if was_counted == is_counted:
+        return
+    try:
+        await record_orders([order], 1 if is_counted else -1)
+    except Exception:
+        logger.exception("Could not move order %s to status %s in the sales rollups", order["id"], new_status)
+
+
+async def backfill(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   batch_size: int = ROLLUP_BACKFILL_BATCH_SIZE) -> int:
+    """Rebuild the rollups for orders placed in [start, end); returns orders processed.
+
+    The range is widened to whole days so no daily bucket is half rebuilt.
+    Orders placed or changing status inside the range while this runs can
+    be miscounted, so backfill past ranges or run it during a quiet period.
+    """
+    bucket_filter = {}
+    order_filter = {"status": {"$nin": list(EXCLUDED_STATUSES)}}
+    if start:
+        start = truncate(start, "day")
+        bucket_filter["$gte"] = order_filter.setdefault("created_at", {})["$gte"] = start
+    if end:
+        if end != truncate(end, "day"):
+            end = truncate(end, "day") + timedelta(days=1)
+        bucket_filter["$lt"] = order_filter.setdefault("created_at", {})["$lt"] = end
+    await sales_rollups_collection.delete_many({"bucket": bucket_filter} if bucket_filter else {})
+
+    processed = 0
+    for collection in (orders_archive_collection, orders_collection):
+        batch = []
+        async for order in collection.find(order_filter, ORDER_ROLLUP_PROJECTION).batch_size(batch_size):
+            batch.append(order)
+            if len(batch) == batch_size:
+                await record_orders(batch)
+                processed += len(batch)
+                batch = []
+        if batch:
+            await record_orders(batch)
+            processed += len(batch)
+    return processed
+
+
+def _range(granularity: str, dimension: str, start: Optional[datetime], end: Optional[datetime]) -> dict:
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of: {', '.join(DIMENSIONS)}")
+    end = end or datetime.utcnow()
+    start = start or end - ROLLUP_DEFAULT_RANGE
+    return {
+        "granularity": granularity,
+        "dimension": dimension,
+        "bucket": {"$gte": truncate(start, granularity), "$lt": end},
+    }
+
+
+async def summary(dimension: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  limit: int = 50) -> List[dict]:
+    """Totals per product or category over a range, highest revenue first.
+
+    Day-aligned ranges read daily buckets; anything else falls back to hourly
+    ones, with the bounds truncated to the hour.
+    """
+    aligned = all(moment is None or moment == truncate(moment, "day") for moment in (start, end))
+    pipeline = [
+        {"$match": _range("day" if aligned else "hour", dimension, start, end)},
+        # Oldest first, so $last picks each product's most recent name
+        {"$sort": {"bucket": 1}},
+        {"$group": {
+            "_id": "$key",
+            "name": {"$last": "$name"},
+            "revenue": {"$sum": "$revenue"},
+            "orders": {"$sum": "$orders"},
+            "units": {"$sum": "$units"},
+        }},
+        {"$sort": {"revenue": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "key": "$_id", "name": 1, "revenue": 1, "orders": 1, "units": 1}},
+    ]
+    return await fetch_all(sales_rollups_replica_collection.aggregate(pipeline))
+
+
+async def series(dimension: str, granularity: str, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, key: Optional[str] = None) -> List[dict]:
+    """One row per bucket, for a single product/category or summed over all of them."""
+    match = _range(granularity, dimension, start, end)
+    if key is not None:
+        match["key"] = key
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": "$bucket",
+            "revenue": {"$sum": "$revenue"},
+            "orders": {"$sum": "$orders"},
+            "units": {"$sum": "$units"},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {"_id": 0, "bucket": "$_id", "revenue": 1, "orders": 1, "units": 1}},
+    ]
+    return await fetch_all(sales_rollups_replica_collection.aggregate(pipeline))
+
+
+@cli.command()
+def run(
+    start: Optional[datetime] = typer.Option(None, help="First day to rebuild (default: all history)"),
+    end: Optional[datetime] = typer.Option(None, help="Rebuild up to this time (default: now)"),
+    batch_size: int = typer.Option(ROLLUP_BACKFILL_BATCH_SIZE, help="Orders per batch"),
+):
+    """Rebuild the sales rollups from orders and archived orders."""
+    processed = asyncio.run(backfill(start, end, batch_size))
+    typer.echo(f"Rebuilt rollups from {processed:,} orders.")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,365 @@
+"""Synthetic data generator for scale testing.
+
+Bulk-generates users, products, carts and orders straight into MongoDB with
+batched inserts. Output is deterministic for a given --seed, set of counts
+and --now (timestamps, and the time-ordered order and cart ids, are relative
+to it), and each entity type draws from its own random stream, so changing
+--orders does not change the generated catalog.
+
+    python seed.py --users 50000 --products 5000 --orders 1000000 --drop
+    python seed.py --seed 7 --now 2025-06-01T00:00:00   # the exact same dataset every time
+"""
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Iterator, List, Optional
+from pymongo import MongoClient
+from database import MONGO_URL, MONGO_DB_NAME, INDEXES, client_options, connect, close
+from passwords import hash_password
+from stats import STATS_ID
+from ids import uuid7
+from rollups import backfill
+import asyncio
+import math
+import random
+import time
+import typer
+import uuid
+
+cli = typer.Typer(add_completion=False)
+
+# Share of orders in each status, by how long ago the order was placed
+RECENT_STATUSES = (["pending", "processing", "shipped", "cancelled"], [45, 30, 20, 5])
+OLD_STATUSES = (["delivered", "cancelled"], [93, 7])
+RECENT_ORDER_DAYS = 7
+# Items per order (1-6), heavily weighted towards small baskets
+BASKET_SIZE_WEIGHTS = [52, 24, 12, 6, 4, 2]
+QUANTITY_WEIGHTS = [80, 14, 4, 2]
+# Relative order volume per hour of day (UTC), peaking in the evening
+HOURLY_WEIGHTS = [2, 1, 1, 1, 1, 2, 3, 5, 6, 7, 7, 8, 9, 8, 8, 8, 9, 10, 12, 14, 14, 12, 8, 4]
+
+CATEGORIES = {
+    "smartphones": {
+        "brands": ["Apple", "Samsung", "Google", "OnePlus", "Xiaomi", "Motorola"],
+        "lines": ["Pro", "Ultra", "Lite", "Max", "Plus", "Edge"],
+        "price": (149, 1599),
+        "specs": {
+            "display": ["6.1-inch OLED", "6.7-inch AMOLED", "6.4-inch LCD", "6.8-inch Dynamic AMOLED"],
+            "processor": ["A17 Pro chip", "Snapdragon 8 Gen 3", "Tensor G3", "Dimensity 9200"],
+            "storage": ["64GB", "128GB", "256GB", "512GB", "1TB"],
+            "camera": ["12MP dual camera", "48MP main camera", "50MP triple camera", "200MP quad camera"],
+        },
+    },
+    "laptops": {
+        "brands": ["Apple", "Dell", "Lenovo", "HP", "ASUS", "Acer"],
+        "lines": ["Air", "Pro", "XPS", "ThinkPad", "Zenbook", "Swift"],
+        "price": (399, 3999),
+        "specs": {
+            "display": ["13.3-inch", "14-inch", "15.6-inch", "16-inch Liquid Retina"],
+            "processor": ["M3 chip", "Intel Core i7", "Intel Core i5", "AMD Ryzen 7", "AMD Ryzen 9"],
+            "memory": ["8GB", "16GB", "32GB", "64GB"],
+            "storage": ["256GB SSD", "512GB SSD", "1TB SSD", "2TB SSD"],
+        },
+    },
+    "audio": {
+        "brands": ["Sony", "Bose", "Apple", "Sennheiser", "JBL", "Jabra"],
+        "lines": ["Studio", "Sport", "Elite", "Buds", "Max", "Go"],
+        "price": (29, 599),
+        "specs": {
+            "type": ["Over-ear", "On-ear", "In-ear", "Portable speaker"],
+            "connectivity": ["Bluetooth 5.0", "Bluetooth 5.2", "Bluetooth 5.3", "Wired"],
+            "battery": ["8 hours", "20 hours", "30 hours", "40 hours"],
+            "noise_cancellation": ["Active", "Passive", "None"],
+        },
+    },
+    "tablets": {
+        "brands": ["Apple", "Samsung", "Lenovo", "Microsoft", "Amazon"],
+        "lines": ["Air", "Pro", "Tab", "Go", "Mini"],
+        "price": (99, 2199),
+        "specs": {
+            "display": ["8.3-inch", "10.9-inch", "11-inch", "12.9-inch"],
+            "storage": ["64GB", "128GB", "256GB", "1TB"],
+            "connectivity": ["Wi-Fi", "Wi-Fi + Cellular"],
+        },
+    },
+    "cameras": {
+        "brands": ["Canon", "Nikon", "Sony", "Fujifilm", "Panasonic", "GoPro"],
+        "lines": ["Alpha", "EOS", "Z", "X-T", "Lumix", "Hero"],
+        "price": (199, 4499),
+        "specs": {
+            "sensor": ["APS-C 24MP", "Full-frame 24MP", "Full-frame 45MP", "Micro Four Thirds 20MP"],
+            "video": ["4K 30fps", "4K 60fps", "6K 30fps", "8K 24fps"],
+            "stabilization": ["In-body 5-axis", "Lens only", "Electronic"],
+        },
+    },
+    "wearables": {
+        "brands": ["Apple", "Garmin", "Samsung", "Fitbit", "Polar"],
+        "lines": ["Watch", "Fit", "Sense", "Venu", "Active"],
+        "price": (49, 899),
+        "specs": {
+            "display": ["AMOLED", "Retina LTPO", "MIP"],
+            "battery": ["18 hours", "2 days", "7 days", "14 days"],
+            "water_resistance": ["5 ATM", "10 ATM", "IP68"],
+        },
+    },
+    "gaming": {
+        "brands": ["Sony", "Microsoft", "Nintendo", "Razer", "Logitech", "SteelSeries"],
+        "lines": ["Elite", "Pro", "Lite", "X", "Chroma"],
+        "price": (19, 699),
+        "specs": {
+            "platform": ["PC", "PlayStation", "Xbox", "Switch", "Multi-platform"],
+            "connectivity": ["Wired", "Wireless 2.4GHz", "Bluetooth"],
+        },
+    },
+}
+ADJECTIVES = ["Premium", "Compact", "Flagship", "Everyday", "Professional", "Lightweight", "Next-gen"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Priya", "Wei", "Maria", "Omar", "Lena", "Kofi", "Yuki", "Ravi"]
+LAST_NAMES = ["Smith", "Kumar", "Chen", "Garcia", "Okafor", "Nguyen", "Müller", "Rossi", "Sato", "Silva"]
+
+
+def stream(seed: int, name: str) -> random.Random:
+    """Independent, reproducible random stream for one entity type."""
+    return random.Random(f"{seed}:{name}")
+
+
+def make_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def make_time_id(rng: random.Random, at: datetime) -> str:
+    """Time-ordered id matching what the app assigns to orders and cart lines."""
+    return uuid7(int(at.replace(tzinfo=timezone.utc).timestamp() * 1000), rng.getrandbits(74))
+
+
+def zipf_cum_weights(count: int, exponent: float) -> List[float]:
+    """Cumulative weights giving rank k a share proportional to 1 / k**exponent."""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def batched(documents: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert(collection, documents: Iterator[dict], total: int, batch_size: int) -> None:
+    """insert_many in batches, reporting throughput as it goes."""
+    started = time.perf_counter()
+    written = 0
+    for batch in batched(documents, batch_size):
+        collection.insert_many(batch, ordered=False)
+        written += len(batch)
+        rate = written / max(time.perf_counter() - started, 1e-9)
+        typer.echo(f"\r  {collection.name}: {written:,}/{total:,} ({rate:,.0f} docs/s)", nl=False)
+    typer.echo()
+
+
+def generate_products(rng: random.Random, count: int) -> Iterator[dict]:
+    categories = list(CATEGORIES)
+    for _ in range(count):
+        category = rng.choice(categories)
+        spec = CATEGORIES[category]
+        brand = rng.choice(spec["brands"])
+        line = rng.choice(spec["lines"])
+        name = f"{brand} {line} {rng.randint(2, 16)}"
+        low, high = spec["price"]
+        # Log-uniform prices: plenty of cheap items, a long tail of expensive ones
+        price = round(round(math.exp(rng.uniform(math.log(low), math.log(high)))) - 0.01, 2)
+        # Roughly 5% sold out and 10% low on stock
+        roll = rng.random()
+        stock = 0 if roll < 0.05 else rng.randint(1, 9) if roll < 0.15 else rng.randint(10, 500)
+        yield {
+            "id": make_id(rng),
+            "name": name,
+            "description": f"{rng.choice(ADJECTIVES)} {category.rstrip('s')} from {brand} with "
+                           f"{', '.join(rng.sample(list(spec['specs']), k=min(2, len(spec['specs']))))} upgrades",
+            "price": price,
+            "image_url": f"https://picsum.photos/seed/{rng.getrandbits(32)}/600/600",
+            "category": category,
+            "stock": stock,
+            "specifications": {key: rng.choice(values) for key, values in spec["specs"].items()},
+        }
+
+
+def generate_users(rng: random.Random, count: int, admins: int, password_hash: str,
+                   now: datetime, days: int) -> Iterator[dict]:
+    for i in range(count):
+        role = "admin" if i < admins else "user"
+        yield {
+            "id": make_id(rng),
+            "email": f"{role}{i}@example.com",
+            "password": password_hash,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "role": role,
+            # Sign-ups accelerate over time, like order volume
+            "created_at": now - timedelta(days=days * (1 - math.sqrt(rng.random()))),
+        }
+
+
+def generate_carts(rng: random.Random, count: int, user_ids: List[str], products: List[dict],
+                   product_weights: List[float], now: datetime) -> Iterator[dict]:
+    for user_id in rng.sample(user_ids, k=min(count, len(user_ids))):
+        lines = {
+            product["id"]: product
+            for product in rng.choices(products, cum_weights=product_weights, k=rng.randint(1, 4))
+        }
+        for product_id in lines:
+            added_at = now - timedelta(minutes=rng.uniform(0, 7 * 24 * 60))
+            yield {
+                "id": make_time_id(rng, added_at),
+                "user_id": user_id,
+                "product_id": product_id,
+                "quantity": rng.choices(range(1, len(QUANTITY_WEIGHTS) + 1), weights=QUANTITY_WEIGHTS)[0],
+                "added_at": added_at,
+            }
+
+
+def generate_orders(rng: random.Random, count: int, users: List[dict], user_weights: List[float],
+                    products: List[dict], product_weights: List[float], now: datetime) -> Iterator[dict]:
+    basket_sizes = range(1, len(BASKET_SIZE_WEIGHTS) + 1)
+    quantities = range(1, len(QUANTITY_WEIGHTS) + 1)
+    for _ in range(count):
+        user = rng.choices(users, cum_weights=user_weights)[0]
+        # Placed after sign-up, skewed towards recent days, at a busy hour
+        age_days = (now - user["created_at"]).total_seconds() / 86400 * (1 - math.sqrt(rng.random()))
+        day = now - timedelta(days=math.floor(age_days))
+        hour = rng.choices(range(24), weights=HOURLY_WEIGHTS)[0]
+        created_at = min(
+            day.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60), microsecond=0),
+            now,
+        )
+
+        picked = rng.choices(products, cum_weights=product_weights, k=rng.choices(basket_sizes, weights=BASKET_SIZE_WEIGHTS)[0])
+        items = []
+        for product in {product["id"]: product for product in picked}.values():
+            quantity = rng.choices(quantities, weights=QUANTITY_WEIGHTS)[0]
+            items.append({
+                "product_id": product["id"],
+                "name": product["name"],
+                "category": product["category"],
+                "price": product["price"],
+                "quantity": quantity,
+                "total": product["price"] * quantity,
+            })
+
+        statuses, weights = RECENT_STATUSES if age_days < RECENT_ORDER_DAYS else OLD_STATUSES
+        yield {
+            "id": make_time_id(rng, created_at),
+            "user_id": user["id"],
+            "items": items,
+            "total_amount": sum(item["total"] for item in items),
+            "status": rng.choices(statuses, weights=weights)[0],
+            "created_at": created_at,
+        }
+
+
+def _tee(collection, documents: Iterator[dict], total: int, batch_size: int) -> List[dict]:
+    """Insert documents while keeping them for later stages."""
+    kept = []
+
+    def keep():
+        for document in documents:
+            kept.append(document)
+            yield document
+
+    insert(collection, keep(), total, batch_size)
+    return kept
+
+
+def rebuild_rollups(database: str) -> int:
+    """Rebuild the sales rollups for the generated orders; returns orders processed."""
+    async def run() -> int:
+        connect(database)
+        try:
+            return await backfill()
+        finally:
+            close()
+
+    return asyncio.run(run())
+
+
+@cli.command()
+def generate(
+    users: int = typer.Option(10_000, help="Users to create"),
+    products: int = typer.Option(2_000, help="Products to create"),
+    orders: int = typer.Option(100_000, help="Orders to create"),
+    carts: int = typer.Option(1_000, help="Users with an active cart"),
+    admins: int = typer.Option(1, help="Leading users that get the admin role"),
+    days: int = typer.Option(365, help="History the orders and sign-ups span"),
+    seed: int = typer.Option(42, help="Random seed; same seed, counts and --now give the same data"),
+    now: Optional[datetime] = typer.Option(
+        None, help="Time the dataset ends at (UTC, truncated to the hour); default: the current hour"
+    ),
+    password: str = typer.Option("password123", help="Password shared by every generated user"),
+    popularity_skew: float = typer.Option(1.1, help="Zipf exponent for product popularity"),
+    activity_skew: float = typer.Option(0.8, help="Zipf exponent for how often users order"),
+    batch_size: int = typer.Option(5_000, help="Documents per insert_many"),
+    database: str = typer.Option(MONGO_DB_NAME, help="Target database"),
+    drop: bool = typer.Option(False, help="Drop existing users, products, carts and orders (with archived orders and sales rollups) first"),
+):
+    """Generate a synthetic dataset into MongoDB."""
+    db = MongoClient(MONGO_URL, **client_options())[database]
+    if drop:
+        for name in ("users", "products", "cart", "orders", "orders_archive", "sales_rollups"):
+            db[name].drop()
+
+    # Timestamps and time-ordered ids are relative to `now`; without --now the
+    # current hour keeps reruns comparable, but not identical
+    now = (now or datetime.utcnow()).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    password_hash = asyncio.run(hash_password(password))
+
+    typer.echo(f"Generating into {database} (seed {seed}, now {now.isoformat()})")
+    product_docs = list(generate_products(stream(seed, "products"), products))
+    insert(db.products, iter(product_docs), products, batch_size)
+
+    user_docs = [
+        {"id": user["id"], "created_at": user["created_at"]}
+        for user in _tee(db.users, generate_users(stream(seed, "users"), users, admins, password_hash, now, days),
+                         users, batch_size)
+    ]
+
+    # Popularity follows a shuffled Zipf ranking so bestsellers span categories
+    ranking = stream(seed, "ranking")
+    ranked_products = [
+        {"id": p["id"], "name": p["name"], "category": p["category"], "price": p["price"]} for p in product_docs
+    ]
+    ranking.shuffle(ranked_products)
+    ranking.shuffle(user_docs)
+    product_weights = zipf_cum_weights(len(ranked_products), popularity_skew)
+    user_weights = zipf_cum_weights(len(user_docs), activity_skew)
+    del product_docs
+
+    cart_lines = list(generate_carts(
+        stream(seed, "carts"), carts, [user["id"] for user in user_docs], ranked_products, product_weights, now
+    ))
+    insert(db.cart, iter(cart_lines), len(cart_lines), batch_size)
+    insert(
+        db.orders,
+        generate_orders(stream(seed, "orders"), orders, user_docs, user_weights, ranked_products, product_weights, now),
+        orders,
+        batch_size,
+    )
+
+    # Build indexes after loading; one pass over the data is far cheaper
+    # than maintaining them through millions of inserts
+    typer.echo("Building indexes ...")
+    for name, indexes in INDEXES.items():
+        # The app creates orders_archive itself, with compression, on startup
+        if name != "orders_archive":
+            db[name].create_indexes(indexes)
+
+    typer.echo("Rebuilding sales rollups ...")
+    typer.echo(f"  sales_rollups: {rebuild_rollups(database):,} orders")
+
+    # Running workers recompute dashboard stats and drop catalog caches
+    db.meta.delete_one({"_id": STATS_ID})
+    db.meta.update_one({"_id": "catalog"}, {"$inc": {"version": 1}}, upsert=True)
+    typer.echo("Done.")
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,31 +1,106 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Query, UploadFile, File, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from pymongo import MongoClient
 from pydantic import BaseModel, Field
 from typing import Optional, List
+from contextlib import asynccontextmanager
 import os
 import jwt
-import bcrypt
-from datetime import datetime, timedelta
+from datetime import datetime
 import uuid
+import re
+import time
+import asyncio
+import logging
 from bson import ObjectId
 import json
 from bson.json_util import dumps, loads
+from pymongo import UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError, PyMongoError, DuplicateKeyError
 
-# Database connection
-MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
-client = MongoClient(MONGO_URL)
-db = client.techhub_db
+from database import (
+    connect as connect_database,
+    close as close_database,
+    get_client,
+    users_collection,
+    products_collection,
+    cart_collection,
+    orders_collection,
+    orders_archive_collection,
+    users_replica_collection,
+    products_replica_collection,
+    orders_replica_collection,
+    orders_archive_replica_collection,
+    REPLICA_MAX_STALENESS_SECONDS,
+    fetch_all,
+    ensure_indexes,
+    index_report,
+    supports_transactions,
+)
+from pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    STREAM_BATCH_SIZE,
+    cursor_headers,
+    fetch_page,
+    paginated_response,
+    ndjson_response,
+)
+from fields import (
+    PRODUCT_FIELDS,
+    ORDER_FIELDS,
+    PRODUCT_SUMMARY,
+    ORDER_SUMMARY,
+    ADMIN_ORDER_SUMMARY,
+    select_fields,
+    build_projection,
+    pick,
+)
+from metrics import MetricsMiddleware, registry as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from slow_queries import slow_query_log
+from responses import FastJSONResponse, dumps as dumps_json, json_response, etag_matches, not_modified
+from cache import catalog_cache
+from catalog_io import import_products as import_catalog, resolve_format, csv_response
+from passwords import hash_password, verify_password, needs_rehash, rehash_password
+from stats import increment as increment_stats, read_stats, reconcile_periodically
+from archive import ORDER_ARCHIVE_INTERVAL, archive_periodically, ensure_archive_collection
+from ids import uuid7
+from rollups import (
+    ORDER_ROLLUP_PROJECTION,
+    record_order as record_sale,
+    record_status_change as record_sales_status_change,
+    summary as sales_summary,
+    series as sales_series,
+)
+from reports import sales_report, export_response as export_orders_response
+from tokens import (
+    TOKEN_LIFETIME,
+    token_cache,
+    profile_cache,
+    revocations,
+    logouts,
+    token_key,
+    is_revoked,
+    revoke_token,
+    revoke_user_tokens,
+    stats as auth_cache_stats,
+)
 
-# Collections
-users_collection = db.users
-products_collection = db.products
-cart_collection = db.cart
-orders_collection = db.orders
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each worker process builds its own Mongo client here, after any fork
+    connect_database()
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
+        close_database()
 
 # FastAPI app
-app = FastAPI(title="TechHub E-commerce API")
+app = FastAPI(title="TechHub E-commerce API", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # Security
 security = HTTPBearer()
@@ -38,8 +113,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Per-route latency, status and in-flight counts, served on /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Pydantic models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -77,6 +156,9 @@ class ProductCreate(BaseModel):
     stock: int
     specifications: dict = {}
 
+class ProductImport(ProductCreate):
+    id: Optional[str] = None
+
 class ProductUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -87,14 +169,23 @@ class ProductUpdate(BaseModel):
     specifications: Optional[dict] = None
 
 class CartItem(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     user_id: str
     product_id: str
     quantity: int
     added_at: datetime = Field(default_factory=datetime.utcnow)
 
+class CartOperation(BaseModel):
+    op: str  # "add", "set" or "remove"
+    product_id: str
+    # "set" to 0 removes the line; "add" needs at least 1 (checked per op)
+    quantity: int = Field(1, ge=0)
+
+class CartBatch(BaseModel):
+    operations: List[CartOperation]
+
 class Order(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     user_id: str
     items: List[dict]
     total_amount: float
@@ -104,29 +195,77 @@ class Order(BaseModel):
 class OrderStatusUpdate(BaseModel):
     status: str
 
-# Helper functions
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+class UserRoleUpdate(BaseModel):
+    role: str
+
+# Stable sort keys for keyset pagination; the trailing unique id breaks
+# ties so pages never overlap
+ORDER_SORT = [("created_at", -1), ("id", -1)]
+# Hot orders, then the archive: every archived order is older than every hot
+# one, so order listings page from the first into the second
+ORDER_PARTITIONS = (orders_collection, orders_archive_collection)
+ORDER_REPORT_PARTITIONS = (orders_replica_collection, orders_archive_replica_collection)
+PRODUCT_SORT = [("id", 1)]
+
+# Documents are read without _id so they serialize as-is; reserved_by is
+# checkout bookkeeping
+PRODUCT_PROJECTION = {"_id": 0, "reserved_by": 0}
+ORDER_PROJECTION = {"_id": 0}
+USER_PROJECTION = {"_id": 0, "password": 0}
+
+# Product search ranks by text relevance, then id; sorting on the score
+# does not need it projected (MongoDB 4.4+), so it stays out of responses
+SEARCH_SORT = [("score", {"$meta": "textScore"}), ("id", 1)]
+USER_SORT = [("id", 1)]
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+# Products below this stock level are flagged on the dashboard
+LOW_STOCK_THRESHOLD = 10
 
+# Upper bound on operations in one /api/cart/batch request
+MAX_CART_BATCH = 500
+
+# Product fields the cart page renders
+CART_PRODUCT_FIELDS = ["id", "name", "price", "image_url", "category", "stock"]
+CART_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "product_id": 1,
+    "quantity": 1,
+    "added_at": 1,
+    **{f"product.{field}": 1 for field in CART_PRODUCT_FIELDS}
+}
+
+# Helper functions
 def create_token(user_id: str, role: str) -> str:
     payload = {
         'user_id': user_id,
         'role': role,
-        'exp': datetime.utcnow() + timedelta(days=7)
+        'iat': time.time(),
+        'exp': datetime.utcnow() + TOKEN_LIFETIME
     }
     return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    key = token_key(credentials.credentials)
+    await revocations.sync()
+    await logouts.sync()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    generation = token_cache.generation
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=['HS256'])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    if await is_revoked(key, payload):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    
+    token_cache.set(key, payload, generation, ttl=payload['exp'] - time.time())
+    return payload
 
 def verify_admin(token_payload: dict = Depends(verify_token)):
     if token_payload.get('role') != 'admin':
@@ -136,14 +275,70 @@ def verify_admin(token_payload: dict = Depends(verify_token)):
 def get_current_user_id(token_payload: dict = Depends(verify_token)):
     return token_payload['user_id']
 
+def catalog_reads():
+    """Products handle for catalog reads.
+
+    Secondaries serve the catalog, except right after a change this worker
+    has seen: until they have caught up, reads go to the primary so a stale
+    document is never cached under the new catalog version.
+    """
+    if catalog_cache.changed_within(REPLICA_MAX_STALENESS_SECONDS):
+        return products_collection
+    return products_replica_collection
+
+async def attach_users(orders: List[dict], fields) -> None:
+    """Copy user fields onto orders as user_<field>, with one query for the whole batch."""
+    user_ids = list({order["user_id"] for order in orders})
+    if not user_ids:
+        return
+    projection = {"_id": 0, "id": 1, **{field: 1 for field in fields}}
+    # Only admin reports attach users, so a replica may serve them
+    users = await fetch_all(users_replica_collection.find({"id": {"$in": user_ids}}, projection))
+    users_by_id = {user["id"]: user for user in users}
+    for order in orders:
+        user = users_by_id.get(order["user_id"])
+        if user:
+            for field in fields:
+                order[f"user_{field}"] = user[field]
+
+async def search_products(collection, query: dict, search: str, limit: int, projection: dict) -> List[dict]:
+    """Ranked full-text matches, topped up with products whose name starts with `search`.
+
+    The text index only matches whole (stemmed) words, so a partial term
+    typed into the search box ("lapt") finds nothing there; the anchored
+    name regex catches it and is answered from the name index.
+    """
+    products = await fetch_all(
+        collection.find({**query, "$text": {"$search": search}}, projection).sort(SEARCH_SORT).limit(limit)
+    )
+    if len(products) < limit:
+        prefix = {"$regex": "^" + re.escape(search.strip()), "$options": "i"}
+        products += await fetch_all(
+            collection.find({**query, "name": prefix, "id": {"$nin": [product["id"] for product in products]}}, projection)
+            .sort(PRODUCT_SORT)
+            .limit(limit - len(products))
+        )
+    return products
+
+# Background tasks correcting drift in the dashboard counters and moving old
+# orders to the archive
+stats_reconciler = None
+order_archiver = None
+
+# Sample product ids are uuid5(SAMPLE_PRODUCT_NAMESPACE, name)
+SAMPLE_PRODUCT_NAMESPACE = uuid.UUID("0b9d6e1c-3f6a-4f43-9c55-7a0e6f2d8b41")
+
 # Initialize sample products
-@app.on_event("startup")
 async def startup_event():
+    global stats_reconciler, order_archiver
+    # Before its indexes, which would otherwise create it uncompressed
+    await ensure_archive_collection()
+    await ensure_indexes()
+
     # Check if products already exist
-    if products_collection.count_documents({}) == 0:
+    if await products_collection.count_documents({}) == 0:
         sample_products = [
             {
-                "id": str(uuid.uuid4()),
                 "name": "iPhone 15 Pro",
                 "description": "The latest iPhone with advanced camera system and titanium design",
                 "price": 999.99,
@@ -158,7 +353,6 @@ async def startup_event():
                 }
             },
             {
-                "id": str(uuid.uuid4()),
                 "name": "Samsung Galaxy S24",
                 "description": "Premium Android smartphone with AI-powered features",
                 "price": 899.99,
@@ -173,7 +367,6 @@ async def startup_event():
                 }
             },
             {
-                "id": str(uuid.uuid4()),
                 "name": "Sony WH-1000XM5",
                 "description": "Industry-leading noise canceling wireless headphones",
                 "price": 399.99,
@@ -188,7 +381,6 @@ async def startup_event():
                 }
             },
             {
-                "id": str(uuid.uuid4()),
                 "name": "MacBook Pro 16-inch",
                 "description": "Powerful laptop with M3 Pro chip for professional work",
                 "price": 2499.99,
@@ -203,7 +395,6 @@ async def startup_event():
                 }
             },
             {
-                "id": str(uuid.uuid4()),
                 "name": "Canon EOS R5",
                 "description": "Professional mirrorless camera with 8K video recording",
                 "price": 3899.99,
@@ -218,7 +409,6 @@ async def startup_event():
                 }
             },
             {
-                "id": str(uuid.uuid4()),
                 "name": "LG OLED55C3PUA",
                 "description": "55-inch 4K OLED Smart TV with AI-powered processor",
                 "price": 1299.99,
@@ -233,7 +423,36 @@ async def startup_event():
                 }
             }
         ]
-        products_collection.insert_many(sample_products)
+        # Every worker runs this on a fresh database; ids derived from the
+        # names make the upserts idempotent, so only one copy is inserted
+        # and counted
+        writes = [
+            UpdateOne(
+                {"id": str(uuid.uuid5(SAMPLE_PRODUCT_NAMESPACE, product["name"]))},
+                {"$setOnInsert": product},
+                upsert=True
+            )
+            for product in sample_products
+        ]
+        try:
+            inserted = (await products_collection.bulk_write(writes, ordered=False)).upserted_count
+        except BulkWriteError as e:
+            # Another worker inserted some of them between match and insert
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            inserted = e.details["nUpserted"]
+        await increment_stats(total_products=inserted)
+    
+    # Build the dashboard counters once, then keep correcting drift
+    await read_stats()
+    stats_reconciler = asyncio.create_task(reconcile_periodically())
+    if ORDER_ARCHIVE_INTERVAL > 0:
+        order_archiver = asyncio.create_task(archive_periodically())
+
+async def shutdown_event():
+    for task in (stats_reconciler, order_archiver):
+        if task:
+            task.cancel()
 
 # API Routes
 
@@ -241,22 +460,23 @@ async def startup_event():
 @app.post("/api/auth/register")
 async def register(user_data: UserRegister):
     # Check if user exists
-    if users_collection.find_one({"email": user_data.email}):
+    if await users_collection.find_one({"email": user_data.email}):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Check if this is the first user (make them admin)
-    user_count = users_collection.count_documents({})
+    user_count = await users_collection.count_documents({})
     role = "admin" if user_count == 0 else "user"
     
     # Create user
     user = User(
         email=user_data.email,
-        password=hash_password(user_data.password),
+        password=await hash_password(user_data.password),
         name=user_data.name,
         role=role
     )
     
-    users_collection.insert_one(user.dict())
+    await users_collection.insert_one(user.dict())
+    await increment_stats(total_users=1)
     token = create_token(user.id, user.role)
     
     return {
@@ -267,11 +487,18 @@ async def register(user_data: UserRegister):
 
 @app.post("/api/auth/login")
 async def login(user_data: UserLogin):
-    user = users_collection.find_one({"email": user_data.email})
+    user = await users_collection.find_one({"email": user_data.email})
     
-    if not user or not verify_password(user_data.password, user["password"]):
+    if not user or not await verify_password(user_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    # Upgrade the stored hash when the configured bcrypt cost has changed;
+    # skipped while the bcrypt pool is busy so a valid login never fails on it
+    if needs_rehash(user["password"]):
+        rehashed = await rehash_password(user_data.password)
+        if rehashed:
+            await users_collection.update_one({"id": user["id"]}, {"$set": {"password": rehashed}})
+    
     token = create_token(user["id"], user["role"])
     
     return {
@@ -280,55 +507,140 @@ async def login(user_data: UserLogin):
         "user": {"id": user["id"], "email": user["email"], "name": user["name"], "role": user["role"]}
     }
 
+@app.post("/api/auth/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token_payload: dict = Depends(verify_token)
+):
+    await revoke_token(token_key(credentials.credentials), token_payload)
+    return {"message": "Logged out successfully"}
+
 @app.get("/api/auth/me")
 async def get_current_user(user_id: str = Depends(get_current_user_id)):
-    user = users_collection.find_one({"id": user_id})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    return {"id": user["id"], "email": user["email"], "name": user["name"], "role": user["role"]}
+    profile = profile_cache.get(user_id)
+    if profile is None:
+        generation = profile_cache.generation
+        user = await users_collection.find_one({"id": user_id})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        profile = {"id": user["id"], "email": user["email"], "name": user["name"], "role": user["role"]}
+        profile_cache.set(user_id, profile, generation)
+    return profile
 
 # Product routes
 @app.get("/api/products")
-async def get_products(category: Optional[str] = None, search: Optional[str] = None):
+async def get_products(
+    request: Request,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False
+):
+    selected = select_fields(fields, PRODUCT_FIELDS, PRODUCT_SUMMARY)
+    projection = build_projection(selected, PRODUCT_PROJECTION, required=("id",))
+    
     query = {}
     if category:
         query["category"] = category
-    if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
-        ]
     
-    products = list(products_collection.find(query))
-    # Convert ObjectId to string for JSON serialization
-    for product in products:
-        if '_id' in product:
-            product['_id'] = str(product['_id'])
-    return products
+    if search and cursor:
+        raise HTTPException(status_code=400, detail="Search results are not paginated; cursor cannot be combined with search")
+    
+    if stream:
+        if search:
+            # Exports match whole words through the text index only
+            query["$text"] = {"$search": search}
+            return ndjson_response(catalog_reads(), query, SEARCH_SORT, projection=projection)
+        return ndjson_response(catalog_reads(), query, PRODUCT_SORT, cursor, projection)
+    
+    await catalog_cache.sync()
+    headers = catalog_cache.headers()
+    if etag_matches(request.headers.get("if-none-match"), headers.get("ETag")):
+        return not_modified(headers)
+    
+    cache_key = (category, search, selected, limit, cursor)
+    cached = catalog_cache.queries.get(cache_key)
+    if cached is None:
+        generation = catalog_cache.queries.generation
+        if search:
+            # Relevance order has no stable keyset, so searches return the
+            # top `limit` matches
+            products = await search_products(catalog_reads(), query, search, limit, projection)
+            next_cursor = None
+        else:
+            products, next_cursor = await fetch_page(
+                catalog_reads(), query, PRODUCT_SORT, limit, cursor, projection
+            )
+        # Cache the encoded page so hits skip serialization entirely
+        cached = (dumps_json(products), next_cursor)
+        catalog_cache.queries.set(cache_key, cached, generation)
+    
+    body, next_cursor = cached
+    return json_response(body, {**headers, **cursor_headers(next_cursor)})
 
 @app.get("/api/products/{product_id}")
-async def get_product(product_id: str):
-    product = products_collection.find_one({"id": product_id})
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    # Convert ObjectId to string for JSON serialization
-    if '_id' in product:
-        product['_id'] = str(product['_id'])
-    return product
+async def get_product(request: Request, product_id: str, fields: Optional[str] = None):
+    selected = select_fields(fields, PRODUCT_FIELDS)
+    await catalog_cache.sync()
+    headers = catalog_cache.headers()
+    if etag_matches(request.headers.get("if-none-match"), headers.get("ETag")):
+        return not_modified(headers)
+    
+    product = catalog_cache.products.get(product_id)
+    if product is None:
+        generation = catalog_cache.products.generation
+        product = await catalog_reads().find_one({"id": product_id}, PRODUCT_PROJECTION)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        catalog_cache.products.set(product_id, product, generation)
+    return json_response(pick(product, selected), headers)
 
 @app.get("/api/categories")
-async def get_categories():
-    categories = products_collection.distinct("category")
-    return categories
+async def get_categories(request: Request):
+    await catalog_cache.sync()
+    headers = catalog_cache.headers()
+    if etag_matches(request.headers.get("if-none-match"), headers.get("ETag")):
+        return not_modified(headers)
+    
+    categories = catalog_cache.queries.get("categories")
+    if categories is None:
+        generation = catalog_cache.queries.generation
+        categories = await catalog_reads().distinct("category")
+        catalog_cache.queries.set("categories", categories, generation)
+    return json_response(categories, headers)
 
 # Admin Product Management Routes
 @app.post("/api/admin/products")
 async def create_product(product_data: ProductCreate, admin_id: str = Depends(verify_admin)):
     product = Product(**product_data.dict())
-    products_collection.insert_one(product.dict())
+    await products_collection.insert_one(product.dict())
+    await increment_stats(total_products=1)
+    await catalog_cache.bump()
     return {"message": "Product created successfully", "product_id": product.id}
 
+@app.post("/api/admin/products/import")
+async def import_products(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    admin_id: str = Depends(verify_admin)
+):
+    fmt = resolve_format(format, file.filename)
+    report = await import_catalog(file.file, fmt, ProductImport)
+    
+    await increment_stats(total_products=report["inserted"])
+    await catalog_cache.bump()
+    return report
+
+@app.get("/api/admin/products/export")
+async def export_products(format: Optional[str] = None, admin_id: str = Depends(verify_admin)):
+    if resolve_format(format) == "csv":
+        cursor = catalog_reads().find({}, PRODUCT_PROJECTION).sort(PRODUCT_SORT).batch_size(STREAM_BATCH_SIZE)
+        return csv_response(cursor, "products.csv")
+    return ndjson_response(catalog_reads(), {}, PRODUCT_SORT, projection=PRODUCT_PROJECTION)
+
 @app.put("/api/admin/products/{product_id}")
 async def update_product(product_id: str, product_data: ProductUpdate, admin_id: str = Depends(verify_admin)):
     update_data = {k: v for k, v in product_data.dict().items() if v is not None}
@@ -336,163 +648,319 @@ async def update_product(product_id: str, product_data: ProductUpdate, admin_id:
     if not update_data:
         raise HTTPException(status_code=400, detail="No data to update")
     
-    result = products_collection.update_one({"id": product_id}, {"$set": update_data})
+    result = await products_collection.update_one({"id": product_id}, {"$set": update_data})
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    await catalog_cache.bump()
     return {"message": "Product updated successfully"}
 
 @app.delete("/api/admin/products/{product_id}")
 async def delete_product(product_id: str, admin_id: str = Depends(verify_admin)):
-    result = products_collection.delete_one({"id": product_id})
+    result = await products_collection.delete_one({"id": product_id})
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    await increment_stats(total_products=-1)
+    await catalog_cache.bump()
     return {"message": "Product deleted successfully"}
 
 # Admin Order Management Routes
 @app.get("/api/admin/orders")
-async def get_all_orders(admin_id: str = Depends(verify_admin)):
-    orders = list(orders_collection.find({}).sort("created_at", -1))
-    # Convert ObjectId to string for JSON serialization
-    for order in orders:
-        if '_id' in order:
-            order['_id'] = str(order['_id'])
-        # Get user info for each order
-        user = users_collection.find_one({"id": order["user_id"]})
-        if user:
-            order["user_name"] = user["name"]
-            order["user_email"] = user["email"]
-    return orders
+async def get_all_orders(
+    order_status: Optional[str] = Query(None, alias="status"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    admin_id: str = Depends(verify_admin)
+):
+    selected = select_fields(fields, ORDER_FIELDS, ADMIN_ORDER_SUMMARY)
+    projection = build_projection(selected, ORDER_PROJECTION, required=("id", "created_at", "user_id"))
+    
+    query = {}
+    if order_status:
+        query["status"] = order_status
+    if start_date or end_date:
+        query["created_at"] = {}
+        if start_date:
+            query["created_at"]["$gte"] = start_date
+        if end_date:
+            query["created_at"]["$lt"] = end_date
+    
+    async def with_users(orders: List[dict]) -> None:
+        await attach_users(orders, ("name", "email"))
+    
+    if stream:
+        return ndjson_response(ORDER_REPORT_PARTITIONS, query, ORDER_SORT, cursor, projection, with_users)
+    
+    orders, next_cursor = await fetch_page(ORDER_REPORT_PARTITIONS, query, ORDER_SORT, limit, cursor, projection)
+    await with_users(orders)
+    return json_response(orders, cursor_headers(next_cursor))
 
 @app.put("/api/admin/orders/{order_id}/status")
 async def update_order_status(order_id: str, status_data: OrderStatusUpdate, admin_id: str = Depends(verify_admin)):
-    result = orders_collection.update_one(
-        {"id": order_id}, 
-        {"$set": {"status": status_data.status}}
-    )
+    for collection in ORDER_PARTITIONS:
+        previous = await collection.find_one_and_update(
+            {"id": order_id},
+            {"$set": {"status": status_data.status}},
+            projection=ORDER_ROLLUP_PROJECTION
+        )
+        if previous is not None:
+            break
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    was_pending = previous.get("status") == "pending"
+    is_pending = status_data.status == "pending"
+    await increment_stats(pending_orders=int(is_pending) - int(was_pending))
+    await record_sales_status_change(previous, status_data.status)
+    
     return {"message": "Order status updated successfully"}
 
 # Admin User Management Routes
 @app.get("/api/admin/users")
-async def get_all_users(admin_id: str = Depends(verify_admin)):
-    users = list(users_collection.find({}, {"password": 0}))  # Exclude password
-    # Convert ObjectId to string for JSON serialization
-    for user in users:
-        if '_id' in user:
-            user['_id'] = str(user['_id'])
-    return users
+async def get_all_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    admin_id: str = Depends(verify_admin)
+):
+    if stream:
+        return ndjson_response(users_replica_collection, {}, USER_SORT, cursor, USER_PROJECTION)
+    
+    return await paginated_response(users_replica_collection, {}, USER_SORT, limit, cursor, USER_PROJECTION)
+
+@app.put("/api/admin/users/{user_id}/role")
+async def update_user_role(user_id: str, role_data: UserRoleUpdate, admin_id: str = Depends(verify_admin)):
+    if role_data.role not in ("user", "admin"):
+        raise HTTPException(status_code=400, detail="Role must be 'user' or 'admin'")
+    
+    result = await users_collection.update_one({"id": user_id}, {"$set": {"role": role_data.role}})
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Tokens carry the old role; force the user to sign in again
+    await revoke_user_tokens(user_id)
+    return {"message": "User role updated successfully"}
+
+# Metrics Routes
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+# Admin Cache Routes
+@app.get("/api/admin/cache")
+async def get_cache_stats(admin_id: str = Depends(verify_admin)):
+    return {"catalog": catalog_cache.stats(), "auth": auth_cache_stats()}
+
+# Admin Slow Query Routes
+@app.get("/api/admin/slow-queries")
+async def get_slow_queries(
+    limit: Optional[int] = Query(None, ge=1),
+    admin_id: str = Depends(verify_admin)
+):
+    # Entries are per worker; each reflects what this process observed
+    return json_response(slow_query_log.report(limit))
+
+@app.delete("/api/admin/slow-queries")
+async def clear_slow_queries(admin_id: str = Depends(verify_admin)):
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+# Admin Index Routes
+@app.get("/api/admin/indexes")
+async def get_index_report(admin_id: str = Depends(verify_admin)):
+    return await index_report()
+
+# Admin Sales Rollup Routes
+@app.get("/api/admin/sales/summary")
+async def get_sales_summary(
+    dimension: str = "category",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    admin_id: str = Depends(verify_admin)
+):
+    # Totals per category or product over the range (default: last 90 days)
+    return json_response(await sales_summary(dimension, start, end, limit))
+
+@app.get("/api/admin/sales/series")
+async def get_sales_series(
+    dimension: str = "total",
+    granularity: str = "day",
+    key: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    admin_id: str = Depends(verify_admin)
+):
+    # Hourly or daily buckets for one product/category, or all of them summed
+    return json_response(await sales_series(dimension, granularity, start, end, key))
+
+@app.get("/api/admin/reports/sales")
+async def get_sales_report(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    admin_id: str = Depends(verify_admin)
+):
+    # Top products, basket sizes and cohort revenue computed over raw orders
+    return json_response(await sales_report(start, end, limit))
+
+@app.get("/api/admin/reports/export")
+async def export_orders(
+    table: str = "items",
+    format: str = "csv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    admin_id: str = Depends(verify_admin)
+):
+    return await export_orders_response(table, format, start, end)
 
 # Admin Dashboard Routes
 @app.get("/api/admin/dashboard")
 async def get_dashboard_stats(admin_id: str = Depends(verify_admin)):
-    # Get basic stats
-    total_users = users_collection.count_documents({})
-    total_products = products_collection.count_documents({})
-    total_orders = orders_collection.count_documents({})
-    
-    # Get pending orders
-    pending_orders = orders_collection.count_documents({"status": "pending"})
-    
-    # Get total revenue
-    pipeline = [
-        {"$group": {"_id": None, "total_revenue": {"$sum": "$total_amount"}}}
-    ]
-    revenue_result = list(orders_collection.aggregate(pipeline))
-    total_revenue = revenue_result[0]["total_revenue"] if revenue_result else 0
+    # Counters are maintained incrementally by the write paths
+    stats = await read_stats()
     
     # Get recent orders
-    recent_orders = list(orders_collection.find({}).sort("created_at", -1).limit(5))
-    for order in recent_orders:
-        if '_id' in order:
-            order['_id'] = str(order['_id'])
-        user = users_collection.find_one({"id": order["user_id"]})
-        if user:
-            order["user_name"] = user["name"]
+    recent_orders = await fetch_all(orders_replica_collection.find({}, ORDER_PROJECTION).sort(ORDER_SORT).limit(5))
+    await attach_users(recent_orders, ("name",))
     
     # Get low stock products
-    low_stock_products = list(products_collection.find({"stock": {"$lt": 10}}))
-    for product in low_stock_products:
-        if '_id' in product:
-            product['_id'] = str(product['_id'])
+    low_stock_products = await fetch_all(
+        products_replica_collection.find({"stock": {"$lt": LOW_STOCK_THRESHOLD}}, PRODUCT_PROJECTION)
+    )
     
-    return {
-        "total_users": total_users,
-        "total_products": total_products,
-        "total_orders": total_orders,
-        "pending_orders": pending_orders,
-        "total_revenue": total_revenue,
+    return json_response({
+        **stats,
         "recent_orders": recent_orders,
         "low_stock_products": low_stock_products
-    }
+    })
 
 # Cart routes
 @app.post("/api/cart/add")
-async def add_to_cart(product_id: str, quantity: int = 1, user_id: str = Depends(get_current_user_id)):
+async def add_to_cart(product_id: str, quantity: int = Query(1, ge=1), user_id: str = Depends(get_current_user_id)):
     # Check if product exists
-    product = products_collection.find_one({"id": product_id})
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+    if not catalog_cache.products.get(product_id):
+        if not await products_collection.find_one({"id": product_id}, {"_id": 0, "id": 1}):
+            raise HTTPException(status_code=404, detail="Product not found")
     
-    # Check if item already in cart
-    existing_item = cart_collection.find_one({"user_id": user_id, "product_id": product_id})
-    
-    if existing_item:
-        # Update quantity
-        cart_collection.update_one(
-            {"user_id": user_id, "product_id": product_id},
-            {"$inc": {"quantity": quantity}}
-        )
-    else:
-        # Add new item
-        cart_item = CartItem(
-            user_id=user_id,
-            product_id=product_id,
-            quantity=quantity
-        )
-        cart_collection.insert_one(cart_item.dict())
+    # Insert the line or bump its quantity in one atomic upsert
+    line, update = cart_upsert(user_id, product_id, {"$inc": {"quantity": quantity}})
+    try:
+        await cart_collection.update_one(line, update, upsert=True)
+    except DuplicateKeyError:
+        # A concurrent request created the line first; it is an update now
+        await cart_collection.update_one(line, update)
     
     return {"message": "Item added to cart"}
 
+@app.post("/api/cart/batch")
+async def batch_update_cart(batch: CartBatch, user_id: str = Depends(get_current_user_id)):
+    if not batch.operations:
+        raise HTTPException(status_code=400, detail="No operations given")
+    if len(batch.operations) > MAX_CART_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CART_BATCH} operations per batch")
+    for operation in batch.operations:
+        if operation.op not in ("add", "set", "remove"):
+            raise HTTPException(status_code=400, detail=f"Unknown cart operation: {operation.op}")
+        if operation.op == "add" and operation.quantity < 1:
+            raise HTTPException(status_code=400, detail="add needs a quantity of at least 1")
+    
+    # Every product being added must exist; checked with one query. Removing
+    # a line (including "set" to 0) works even if its product is gone
+    wanted = {
+        operation.product_id for operation in batch.operations
+        if operation.op == "add" or (operation.op == "set" and operation.quantity > 0)
+    }
+    found = await products_collection.distinct("id", {"id": {"$in": list(wanted)}}) if wanted else []
+    missing = wanted - set(found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Products not found: {', '.join(sorted(missing))}")
+    
+    # (write, upserted line) pairs; the line is kept to retry the write as a plain update
+    writes = []
+    for operation in batch.operations:
+        line = {"user_id": user_id, "product_id": operation.product_id}
+        if operation.op == "remove" or (operation.op == "set" and operation.quantity == 0):
+            writes.append((DeleteOne(line), None))
+            continue
+        if operation.op == "set":
+            upsert = cart_upsert(user_id, operation.product_id, {"$set": {"quantity": operation.quantity}})
+        else:
+            upsert = cart_upsert(user_id, operation.product_id, {"$inc": {"quantity": operation.quantity}})
+        writes.append((UpdateOne(*upsert, upsert=True), upsert))
+    
+    counts = {"nUpserted": 0, "nModified": 0, "nRemoved": 0}
+    start = 0
+    while start < len(writes):
+        try:
+            # Ordered so several operations on the same product apply in sequence
+            result = await cart_collection.bulk_write([write for write, _ in writes[start:]], ordered=True)
+            details, start = result.bulk_api_result, len(writes)
+        except BulkWriteError as e:
+            details = e.details
+            error = details["writeErrors"][0]
+            failed = start + error["index"]
+            if error["code"] != 11000 or writes[failed][1] is None:
+                raise
+            # A concurrent request created the line first; it is an update now
+            writes[failed] = (UpdateOne(*writes[failed][1]), None)
+            start = failed
+        for name in counts:
+            counts[name] += details[name]
+    
+    return {
+        "message": "Cart updated",
+        "added": counts["nUpserted"],
+        "updated": counts["nModified"],
+        "removed": counts["nRemoved"]
+    }
+
 @app.get("/api/cart")
 async def get_cart(user_id: str = Depends(get_current_user_id)):
-    cart_items = list(cart_collection.find({"user_id": user_id}))
+    # Join cart lines with their products in a single aggregation
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$lookup": {
+            "from": "products",
+            "localField": "product_id",
+            "foreignField": "id",
+            "as": "product"
+        }},
+        {"$project": CART_PROJECTION}
+    ]
+    cart_items = await fetch_all(cart_collection.aggregate(pipeline))
     
-    # Get product details for each cart item
+    # Lines whose product was deleted stay in the cart, flagged unavailable,
+    # until the user removes them; checkout refuses them with a 409
     cart_with_products = []
     for item in cart_items:
-        # Convert ObjectId to string
-        if '_id' in item:
-            item['_id'] = str(item['_id'])
-            
-        product = products_collection.find_one({"id": item["product_id"]})
-        if product:
-            # Convert product ObjectId to string
-            if '_id' in product:
-                product['_id'] = str(product['_id'])
-                
-            cart_with_products.append({
-                "id": item["id"],
-                "product": product,
-                "quantity": item["quantity"],
-                "added_at": item["added_at"]
-            })
-    
-    return cart_with_products
+        cart_with_products.append({
+            "id": item["id"],
+            "product_id": item["product_id"],
+            "product": item["product"][0] if item["product"] else None,
+            "quantity": item["quantity"],
+            "added_at": item["added_at"],
+            "available": bool(item["product"])
+        })
+    
+    return json_response(cart_with_products)
 
 @app.put("/api/cart/{cart_item_id}")
 async def update_cart_item(cart_item_id: str, quantity: int, user_id: str = Depends(get_current_user_id)):
     if quantity <= 0:
-        cart_collection.delete_one({"id": cart_item_id, "user_id": user_id})
+        await cart_collection.delete_one({"id": cart_item_id, "user_id": user_id})
         return {"message": "Item removed from cart"}
     
-    cart_collection.update_one(
+    await cart_collection.update_one(
         {"id": cart_item_id, "user_id": user_id},
         {"$set": {"quantity": quantity}}
     )
@@ -500,39 +968,157 @@ async def update_cart_item(cart_item_id: str, quantity: int, user_id: str = Depe
 
 @app.delete("/api/cart/{cart_item_id}")
 async def remove_from_cart(cart_item_id: str, user_id: str = Depends(get_current_user_id)):
-    cart_collection.delete_one({"id": cart_item_id, "user_id": user_id})
+    await cart_collection.delete_one({"id": cart_item_id, "user_id": user_id})
     return {"message": "Item removed from cart"}
 
 @app.delete("/api/cart")
 async def clear_cart(user_id: str = Depends(get_current_user_id)):
-    cart_collection.delete_many({"user_id": user_id})
+    await cart_collection.delete_many({"user_id": user_id})
     return {"message": "Cart cleared"}
 
+# Cart helpers
+def cart_upsert(user_id: str, product_id: str, update: dict):
+    """(filter, update) upserting the (user_id, product_id) cart line; new lines get an id and added_at."""
+    cart_item = CartItem(user_id=user_id, product_id=product_id, quantity=0)
+    return (
+        {"user_id": user_id, "product_id": product_id},
+        {**update, "$setOnInsert": {"id": cart_item.id, "added_at": cart_item.added_at}}
+    )
+
+# Checkout helpers
+def stock_reservations(order_items: List[dict], order_id: Optional[str] = None) -> List[UpdateOne]:
+    """Conditional stock decrements; each only applies if enough stock is left.
+
+    With `order_id` the product is also tagged so the decrement can be found
+    and undone when there is no transaction to roll back.
+    """
+    operations = []
+    for item in order_items:
+        if item["quantity"] < 1:
+            raise ValueError(f"cannot reserve a quantity of {item['quantity']}")
+        update = {"$inc": {"stock": -item["quantity"]}}
+        if order_id:
+            update["$push"] = {"reserved_by": order_id}
+        operations.append(UpdateOne({"id": item["product_id"], "stock": {"$gte": item["quantity"]}}, update))
+    return operations
+
+def without_reservation(order_id: str) -> dict:
+    """Aggregation expression for reserved_by minus order_id, dropping the field once empty."""
+    remaining = {"$filter": {
+        "input": {"$ifNull": ["$reserved_by", []]},
+        "as": "reservation",
+        "cond": {"$ne": ["$$reservation", order_id]}
+    }}
+    return {"$cond": [{"$eq": [{"$size": remaining}, 0]}, "$$REMOVE", remaining]}
+
+async def release_stock(order_items: List[dict], order_id: str) -> None:
+    """Compensate: give back stock for every line this order actually reserved."""
+    await products_collection.bulk_write([
+        UpdateOne(
+            {"id": item["product_id"], "reserved_by": order_id},
+            [{"$set": {"stock": {"$add": ["$stock", item["quantity"]]}, "reserved_by": without_reservation(order_id)}}]
+        )
+        for item in order_items
+    ], ordered=False)
+
+async def restore_cart(cart_items: List[dict]) -> None:
+    """Put back cart lines claimed by a checkout that did not go through.
+
+    A line the user re-added in the meantime wins over the claimed copy.
+    """
+    if not cart_items:
+        return
+    try:
+        await cart_collection.insert_many(cart_items, ordered=False)
+    except BulkWriteError:
+        pass
+
+async def commit_order_transaction(order: Order, cart_items: List[dict]) -> None:
+    """Clear the cart, decrement stock and insert the order atomically."""
+    async def apply(session):
+        # Claim the cart lines; a concurrent checkout of the same cart gets
+        # fewer than all of them and its whole transaction is aborted
+        claimed = await cart_collection.delete_many(
+            {"user_id": order.user_id, "id": {"$in": [item["id"] for item in cart_items]}}, session=session
+        )
+        if claimed.deleted_count < len(cart_items):
+            raise HTTPException(status_code=409, detail="Cart is already being checked out")
+        result = await products_collection.bulk_write(stock_reservations(order.items), ordered=False, session=session)
+        if result.modified_count < len(order.items):
+            raise HTTPException(status_code=409, detail="Insufficient stock")
+        await orders_collection.insert_one(order.dict(), session=session)
+    
+    async with await get_client().start_session() as session:
+        await session.with_transaction(apply)
+
+async def commit_order_compensating(order: Order, cart_items: List[dict]) -> None:
+    """Same steps as commit_order_transaction for standalone servers, putting
+    back the cart lines and stock reservations if any later step fails."""
+    claimed = await cart_collection.delete_many(
+        {"user_id": order.user_id, "id": {"$in": [item["id"] for item in cart_items]}}
+    )
+    if claimed.deleted_count < len(cart_items):
+        # Another checkout took some of these lines; give back the rest
+        await restore_cart(cart_items)
+        raise HTTPException(status_code=409, detail="Cart is already being checked out")
+    try:
+        result = await products_collection.bulk_write(stock_reservations(order.items, order.id), ordered=False)
+        if result.modified_count < len(order.items):
+            raise HTTPException(status_code=409, detail="Insufficient stock")
+        await orders_collection.insert_one(order.dict())
+    except (HTTPException, PyMongoError):
+        await release_stock(order.items, order.id)
+        await restore_cart(cart_items)
+        raise
+    await products_collection.update_many(
+        {"id": {"$in": [item["product_id"] for item in order.items]}, "reserved_by": order.id},
+        [{"$set": {"reserved_by": without_reservation(order.id)}}]
+    )
+
 # Order routes
 @app.post("/api/orders")
 async def create_order(user_id: str = Depends(get_current_user_id)):
     # Get cart items
-    cart_items = list(cart_collection.find({"user_id": user_id}))
+    cart_items = await fetch_all(cart_collection.find({"user_id": user_id}))
     
     if not cart_items:
         raise HTTPException(status_code=400, detail="Cart is empty")
     
+    # Resolve every product in one query
+    quantities = {}
+    for item in cart_items:
+        quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+    products = await fetch_all(products_collection.find(
+        {"id": {"$in": list(quantities)}},
+        {"_id": 0, "id": 1, "name": 1, "price": 1, "stock": 1, "category": 1}
+    ))
+    products_by_id = {product["id"]: product for product in products}
+    
+    unavailable = [product_id for product_id in quantities if product_id not in products_by_id]
+    if unavailable:
+        raise HTTPException(status_code=409, detail=f"Products no longer available: {', '.join(unavailable)}")
+    
     # Calculate total and prepare order items
     total_amount = 0
     order_items = []
     
-    for item in cart_items:
-        product = products_collection.find_one({"id": item["product_id"]})
-        if product:
-            item_total = product["price"] * item["quantity"]
-            total_amount += item_total
-            order_items.append({
-                "product_id": product["id"],
-                "name": product["name"],
-                "price": product["price"],
-                "quantity": item["quantity"],
-                "total": item_total
-            })
+    for product_id, quantity in quantities.items():
+        product = products_by_id[product_id]
+        if quantity < 1:
+            # A non-positive line would turn the stock decrement into an increment
+            raise HTTPException(status_code=400, detail=f"Invalid quantity for {product['name']}")
+        if product["stock"] < quantity:
+            raise HTTPException(status_code=409, detail=f"Insufficient stock for {product['name']}")
+        item_total = product["price"] * quantity
+        total_amount += item_total
+        order_items.append({
+            "product_id": product["id"],
+            "name": product["name"],
+            "category": product["category"],
+            "price": product["price"],
+            "quantity": quantity,
+            "total": item_total
+        })
     
     # Create order
     order = Order(
@@ -541,32 +1127,61 @@ async def create_order(user_id: str = Depends(get_current_user_id)):
         total_amount=total_amount
     )
     
-    orders_collection.insert_one(order.dict())
+    # Claim the ordered cart lines, reserve stock and insert the order
+    if await supports_transactions():
+        await commit_order_transaction(order, cart_items)
+    else:
+        await commit_order_compensating(order, cart_items)
+    
+    await increment_stats(total_orders=1, pending_orders=1, total_revenue=total_amount)
+    await record_sale(order.dict())
     
-    # Clear cart
-    cart_collection.delete_many({"user_id": user_id})
+    # Stock changed: a new catalog version drops every worker's cached pages
+    # and ETags, so no client is told its stale listing is still current
+    try:
+        await catalog_cache.bump()
+    except Exception:
+        # The order is placed; other workers catch up within the cache TTL
+        logger.exception("Could not bump the catalog version after order %s", order.id)
+        catalog_cache.clear()
     
     return {"message": "Order created successfully", "order_id": order.id, "total": total_amount}
 
 @app.get("/api/orders")
-async def get_orders(user_id: str = Depends(get_current_user_id)):
-    orders = list(orders_collection.find({"user_id": user_id}).sort("created_at", -1))
-    # Convert ObjectId to string for JSON serialization
-    for order in orders:
-        if '_id' in order:
-            order['_id'] = str(order['_id'])
-    return orders
+async def get_orders(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    user_id: str = Depends(get_current_user_id)
+):
+    selected = select_fields(fields, ORDER_FIELDS, ORDER_SUMMARY)
+    projection = build_projection(selected, ORDER_PROJECTION, required=("id", "created_at"))
+    
+    query = {"user_id": user_id}
+    if stream:
+        return ndjson_response(ORDER_PARTITIONS, query, ORDER_SORT, cursor, projection)
+    
+    return await paginated_response(ORDER_PARTITIONS, query, ORDER_SORT, limit, cursor, projection)
 
 @app.get("/api/orders/{order_id}")
-async def get_order(order_id: str, user_id: str = Depends(get_current_user_id)):
-    order = orders_collection.find_one({"id": order_id, "user_id": user_id})
+async def get_order(order_id: str, fields: Optional[str] = None, user_id: str = Depends(get_current_user_id)):
+    projection = build_projection(select_fields(fields, ORDER_FIELDS), ORDER_PROJECTION, required=("id",))
+    for collection in ORDER_PARTITIONS:
+        order = await collection.find_one({"id": order_id, "user_id": user_id}, projection)
+        if order:
+            break
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    # Convert ObjectId to string for JSON serialization
-    if '_id' in order:
-        order['_id'] = str(order['_id'])
-    return order
+    return json_response(order)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    # WEB_CONCURRENCY worker processes share the port; each one opens its own
+    # Mongo pool (MONGO_MAX_POOL_SIZE connections) in the lifespan hook
+    uvicorn.run(
+        "server:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8001")),
+        workers=int(os.environ.get("WEB_CONCURRENCY", "1")),
+    )
\ No newline at end of file
@@ -0,0 +1,185 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+from metrics import current_request, NO_ROUTE
+import os
+import threading
+import time
+
+# Read commands slower than this are logged; 0 turns the log off
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+# Entries kept in the in-memory ring buffer (per worker process)
+SLOW_QUERY_LOG_SIZE = int(os.environ.get('SLOW_QUERY_LOG_SIZE', '200'))
+# Run explain("executionStats") for slow queries; each distinct shape is
+# explained at most once per SLOW_QUERY_EXPLAIN_INTERVAL seconds
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', '1') == '1'
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', '60'))
+
+WATCHED_COMMANDS = {"find", "aggregate", "count"}
+# Session and transport fields that explain rejects or that carry no shape
+_COMMAND_ENVELOPE = {
+    "lsid", "txnNumber", "autocommit", "startTransaction", "readConcern",
+    "writeConcern", "$db", "$clusterTime", "$readPreference", "comment",
+}
+# Pipeline keys whose values name collections or fields rather than data
+_STRUCTURAL_KEYS = {"from", "localField", "foreignField", "as", "$meta"}
+# Explain runs are queued behind at most this many others, then skipped
+_MAX_PENDING_EXPLAINS = 8
+
+
+def redact(value):
+    """Query shape with every literal replaced by "?"; field names and operators are kept."""
+    if isinstance(value, dict):
+        return {
+            key: item if key in _STRUCTURAL_KEYS and isinstance(item, str) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        # Lists of sub-documents ($and, $or, pipelines) keep their structure;
+        # lists of literals ($in) collapse to a single placeholder
+        if value and all(isinstance(item, dict) for item in value):
+            return [redact(item) for item in value]
+        return "?"
+    # "$field" references are part of the shape, not data
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return "?"
+
+
+def query_shape(command_name: str, command: dict) -> dict:
+    shape = {}
+    if command_name == "aggregate":
+        shape["pipeline"] = redact(command.get("pipeline", []))
+    else:
+        shape["filter"] = redact(command.get("filter", command.get("query", {})))
+    for key in ("sort", "projection", "hint"):
+        if key in command:
+            shape[key] = command[key]
+    return shape
+
+
+def plan_summary(explain: dict) -> dict:
+    """Winning plan stages and execution counters from explain output, without literal bounds."""
+    # Aggregations report the find layer inside their first $cursor stage
+    if "stages" in explain and explain["stages"]:
+        explain = explain["stages"][0].get("$cursor", explain)
+    winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    # Slot-based engine plans nest the classic stage tree under queryPlan
+    winning_plan = winning_plan.get("queryPlan", winning_plan)
+    stats = explain.get("executionStats", {})
+
+    stages = []
+
+    def walk(plan):
+        stage = {"stage": plan.get("stage")}
+        for key in ("indexName", "keyPattern"):
+            if key in plan:
+                stage[key] = plan[key]
+        stages.append(stage)
+        for child in ([plan["inputStage"]] if "inputStage" in plan else []) + plan.get("inputStages", []):
+            walk(child)
+
+    walk(winning_plan)
+    return {
+        "stages": stages,
+        "collscan": any(stage["stage"] == "COLLSCAN" for stage in stages),
+        "n_returned": stats.get("nReturned"),
+        "total_keys_examined": stats.get("totalKeysExamined"),
+        "total_docs_examined": stats.get("totalDocsExamined"),
+        "execution_time_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Logs slow find/aggregate/count commands with their redacted shape.
+
+    Explains run on a single background thread so the listener never blocks
+    the command that triggered it.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, explain: bool, explain_interval: float):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.entries = deque(maxlen=size)
+        self.client = None
+        self._commands = {}
+        self._explained_at = {}
+        self._pending_explains = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+    def attach(self, client) -> None:
+        """Synchronous pymongo client used to run explains."""
+        self.client = client
+
+    def started(self, event) -> None:
+        if self.threshold_ms > 0 and event.command_name in WATCHED_COMMANDS:
+            self._commands[event.connection_id, event.request_id] = (event.database_name, event.command)
+
+    def succeeded(self, event) -> None:
+        started = self._commands.pop((event.connection_id, event.request_id), None)
+        if started is None or event.duration_micros < self.threshold_ms * 1000:
+            return
+        database_name, command = started
+        scope = current_request.get()
+        entry = {
+            "at": datetime.utcnow(),
+            "route": scope.route if scope else NO_ROUTE,
+            "command": event.command_name,
+            "collection": command.get(event.command_name),
+            "duration_ms": round(event.duration_micros / 1000, 3),
+            "shape": query_shape(event.command_name, command),
+            "explain": None,
+        }
+        self.entries.append(entry)
+        self._schedule_explain(entry, database_name, command)
+
+    def failed(self, event) -> None:
+        self._commands.pop((event.connection_id, event.request_id), None)
+
+    def _schedule_explain(self, entry: dict, database_name: str, command: dict) -> None:
+        if not self.explain or self.client is None:
+            return
+        key = repr((entry["collection"], entry["shape"]))
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained_at.get(key, float("-inf")) < self.explain_interval:
+                entry["explain"] = {"skipped": "shape explained recently"}
+                return
+            if self._pending_explains >= _MAX_PENDING_EXPLAINS:
+                entry["explain"] = {"skipped": "explain queue full"}
+                return
+            if len(self._explained_at) > 10_000:
+                self._explained_at.clear()
+            self._explained_at[key] = now
+            self._pending_explains += 1
+        explain_command = {key: value for key, value in command.items() if key not in _COMMAND_ENVELOPE}
+        self._executor.submit(self._run_explain, entry, database_name, explain_command)
+
+    def _run_explain(self, entry: dict, database_name: str, command: dict) -> None:
+        try:
+            explain = self.client[database_name].command({"explain": command, "verbosity": "executionStats"})
+            entry["explain"] = plan_summary(explain)
+        except PyMongoError as e:
+            entry["explain"] = {"error": str(e)}
+        finally:
+            with self._lock:
+                self._pending_explains -= 1
+
+    def report(self, limit: Optional[int] = None) -> dict:
+        entries = list(self.entries)[::-1]
+        return {
+            "threshold_ms": self.threshold_ms,
+            "capacity": self.entries.maxlen,
+            "entries": entries[:limit] if limit else entries,
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAIN_INTERVAL)
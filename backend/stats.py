@@ -0,0 +1,82 @@
+from datetime import datetime
+from database import (
+    meta_collection,
+    users_collection,
+    products_collection,
+    orders_collection,
+    orders_archive_collection,
+    fetch_all,
+)
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Seconds between full recomputations that correct drift in the counters
+STATS_RECONCILE_INTERVAL = float(os.environ.get('STATS_RECONCILE_INTERVAL', '300'))
+
+STATS_ID = "dashboard_stats"
+COUNTERS = ("total_users", "total_products", "total_orders", "pending_orders", "total_revenue")
+
+
+async def increment(**deltas) -> None:
+    """Apply counter deltas to the materialized stats document.
+
+    Callers have already committed the write being counted, so a failure
+    here is logged rather than raised; the next reconcile corrects it.
+    """
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    try:
+        await meta_collection.update_one({"_id": STATS_ID}, {"$inc": deltas}, upsert=True)
+    except Exception:
+        logger.exception("Could not apply stats deltas %s", deltas)
+
+
+async def reconcile() -> dict:
+    """Recompute every counter from the collections and overwrite the document.
+
+    Increments that land while this runs can be counted twice or not at
+    all; the next reconciliation corrects them.
+    """
+    pipeline = [
+        {"$group": {"_id": None, "total_revenue": {"$sum": "$total_amount"}}}
+    ]
+    total_orders = pending_orders = total_revenue = 0
+    # Archived orders still count towards the totals
+    for collection in (orders_collection, orders_archive_collection):
+        revenue_result = await fetch_all(collection.aggregate(pipeline))
+        total_orders += await collection.count_documents({})
+        pending_orders += await collection.count_documents({"status": "pending"})
+        total_revenue += revenue_result[0]["total_revenue"] if revenue_result else 0
+    stats = {
+        "total_users": await users_collection.count_documents({}),
+        "total_products": await products_collection.count_documents({}),
+        "total_orders": total_orders,
+        "pending_orders": pending_orders,
+        "total_revenue": total_revenue,
+        "reconciled_at": datetime.utcnow(),
+    }
+    await meta_collection.update_one({"_id": STATS_ID}, {"$set": stats}, upsert=True)
+    return stats
+
+
+async def read_stats() -> dict:
+    """Current counters; computed from scratch only if never reconciled."""
+    stats = await meta_collection.find_one({"_id": STATS_ID})
+    if not stats or "reconciled_at" not in stats:
+        stats = await reconcile()
+    return {name: stats.get(name, 0) for name in COUNTERS}
+
+
+async def reconcile_periodically() -> None:
+    """Recompute the counters every STATS_RECONCILE_INTERVAL seconds until cancelled."""
+    while True:
+        await asyncio.sleep(STATS_RECONCILE_INTERVAL)
+        try:
+            await reconcile()
+        except Exception:
+            # Increments keep the counters close meanwhile; the next pass fixes drift
+            logger.exception("Stats reconciliation failed; retrying in %ss", STATS_RECONCILE_INTERVAL)
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from cache import LRUCache, VersionStamp
+from database import revoked_tokens_collection, fetch_all
+import hashlib
+import os
+import time
+
+# Lifetime of issued tokens
+TOKEN_LIFETIME = timedelta(days=7)
+
+# Verified token payloads keyed by token hash; entries never outlive `exp`.
+# TOKEN_CACHE_SIZE=0 turns the cache off.
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '4096'))
+TOKEN_CACHE_TTL = float(os.environ.get('TOKEN_CACHE_TTL', '300'))
+# /api/auth/me profiles keyed by user id
+PROFILE_CACHE_SIZE = int(os.environ.get('PROFILE_CACHE_SIZE', '4096'))
+PROFILE_CACHE_TTL = float(os.environ.get('PROFILE_CACHE_TTL', '30'))
+# Seconds between checks for revocations made by other workers
+REVOCATION_CHECK_INTERVAL = float(os.environ.get('REVOCATION_CHECK_INTERVAL', '1'))
+# Each check also looks again at logouts from this many seconds before the
+# previous one, covering clock skew between workers and writes in flight
+REVOCATION_OVERLAP = float(os.environ.get('REVOCATION_OVERLAP', '30'))
+
+token_cache = LRUCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+profile_cache = LRUCache(PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL)
+
+
+def _clear_caches() -> None:
+    token_cache.clear()
+    profile_cache.clear()
+
+
+# Bumped when all of a user's tokens are revoked; every worker then clears
+# both caches. Single-token logouts only evict that token (see Logouts).
+revocations = VersionStamp("auth", REVOCATION_CHECK_INTERVAL, _clear_caches)
+
+
+class Logouts:
+    """Evicts tokens logged out on any worker from this worker's token cache.
+
+    sync() reads the revoked_tokens entries written since its last check,
+    at most once per `check_interval` seconds, so a logout costs every
+    worker one cache entry instead of a cold cache.
+    """
+
+    def __init__(self, check_interval: float, overlap: float):
+        self.check_interval = check_interval
+        self.overlap = timedelta(seconds=overlap)
+        self.checked_through = None
+        self._checked_at = 0.0
+
+    async def sync(self) -> None:
+        if self.check_interval <= 0:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        checked_through = datetime.utcnow()
+        # Nothing was cached before the first check, so there is nothing to evict
+        if self.checked_through is not None:
+            revoked = await fetch_all(revoked_tokens_collection.find(
+                {"revoked_at": {"$gte": self.checked_through - self.overlap}}, {"_id": 1}
+            ))
+            for entry in revoked:
+                token_cache.invalidate(entry["_id"])
+        self.checked_through = checked_through
+
+
+logouts = Logouts(REVOCATION_CHECK_INTERVAL, REVOCATION_OVERLAP)
+
+
+def token_key(token: str) -> str:
+    """Cache and revocation-list key for a raw token."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+async def is_revoked(key: str, payload: dict) -> bool:
+    """True if this token, or every token its user held at the time, was revoked."""
+    user_entry = f"user:{payload['user_id']}"
+    entries = await fetch_all(revoked_tokens_collection.find({"_id": {"$in": [key, user_entry]}}))
+    for entry in entries:
+        if entry["_id"] == key:
+            return True
+        if payload.get("iat", 0) < entry["issued_before"]:
+            return True
+    return False
+
+
+async def revoke_token(key: str, payload: dict) -> None:
+    """Revoke one token (logout). Kept until the token would have expired anyway."""
+    await revoked_tokens_collection.update_one(
+        {"_id": key},
+        {"$set": {"expires_at": datetime.utcfromtimestamp(payload["exp"]), "revoked_at": datetime.utcnow()}},
+        upsert=True
+    )
+    token_cache.invalidate(key)
+
+
+async def revoke_user_tokens(user_id: str) -> None:
+    """Revoke every token issued to a user so far (e.g. after a role change)."""
+    await revoked_tokens_collection.update_one(
+        {"_id": f"user:{user_id}"},
+        {"$set": {"issued_before": time.time(), "expires_at": datetime.utcnow() + TOKEN_LIFETIME}},
+        upsert=True
+    )
+    await revocations.bump()
+
+
+def stats() -> dict:
+    return {
+        "revocation_version": revocations.version,
+        "logouts_checked_through": logouts.checked_through,
+        "tokens": token_cache.stats(),
+        "profiles": profile_cache.stats(),
+    }
@@ -0,0 +1,42 @@
+"""Throughput vs. concurrent clients for the catalog read routes.
+
+With a blocking driver every request serializes on the event loop and RPS
+stays flat as clients are added; on the Motor data layer it should scale
+until Mongo or the CPU saturates. Run it once against a server started from
+the commit before the Motor port and once against this tree.
+
+    uvicorn server:app --port 8001      # from backend/, local mongod running
+    python benchmarks/bench_async_data_layer.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import BASE_URL, session, run_concurrent, print_table
+
+CLIENT_COUNTS = [1, 2, 4, 8, 16, 32, 64]
+DURATION = float(os.environ.get("BENCH_DURATION", "5"))
+
+def main() -> None:
+    products = session().get(f"{BASE_URL}/products").json()
+    product_ids = [product["id"] for product in products]
+    if not product_ids:
+        print("No products found; start the server once so sample data is seeded.")
+        return
+
+    def browse(client_index: int) -> bool:
+        product_id = product_ids[client_index % len(product_ids)]
+        for url in (f"{BASE_URL}/products", f"{BASE_URL}/products/{product_id}", f"{BASE_URL}/categories"):
+            if session().get(url).status_code != 200:
+                return False
+        return True
+
+    rows = []
+    for clients in CLIENT_COUNTS:
+        result = run_concurrent(browse, clients, DURATION)
+        rows.append({"clients": clients, **result})
+    print_table(f"Catalog browse mix against {BASE_URL}", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Rows/sec for POST /api/admin/products/import in NDJSON and CSV.
+
+Rows use fixed ids (bench-import-<n>) in category "bench-import", so the
+first run inserts and later runs measure the update path without growing
+the catalog. While each import runs, one client keeps fetching a product;
+its p99 and worst latency show how long the import holds the event loop.
+
+    BENCH_ADMIN_EMAIL=... BENCH_ADMIN_PASSWORD=... python benchmarks/bench_bulk_import.py
+"""
+import csv
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import BASE_URL, session, admin_headers, percentile, print_table
+
+ROW_COUNTS = [int(n) for n in os.environ.get("BENCH_ROWS", "10000,50000,200000").split(",")]
+COLUMNS = ["id", "name", "description", "price", "image_url", "category", "stock", "specifications"]
+
+def make_rows(count: int) -> list:
+    rng = random.Random(count)
+    return [{
+        "id": f"bench-import-{i}",
+        "name": f"Imported Product {i}",
+        "description": "Synced from the ERP by the import benchmark",
+        "price": round(rng.uniform(5, 4000), 2),
+        "image_url": "https://example.com/import.png",
+        "category": "bench-import",
+        "stock": rng.randint(0, 500),
+        "specifications": {"sku": f"SKU-{i:07d}", "weight": f"{rng.randint(1, 5000)}g"},
+    } for i in range(count)]
+
+def to_ndjson(rows: list) -> bytes:
+    return "\n".join(json.dumps(row) for row in rows).encode("utf-8")
+
+def to_csv(rows: list) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({**row, "specifications": json.dumps(row["specifications"])})
+    return buffer.getvalue().encode("utf-8")
+
+def browse_until(done: threading.Event, product_id: str, latencies: list) -> None:
+    """Fetch one product back to back until `done` is set."""
+    while not done.is_set():
+        started = time.perf_counter()
+        session().get(f"{BASE_URL}/products/{product_id}")
+        latencies.append(time.perf_counter() - started)
+
+def main() -> None:
+    headers = admin_headers()
+    product_id = session().get(f"{BASE_URL}/products").json()[0]["id"]
+    results = []
+    for count in ROW_COUNTS:
+        rows = make_rows(count)
+        for fmt, encode in (("ndjson", to_ndjson), ("csv", to_csv)):
+            payload = encode(rows)
+            done, latencies = threading.Event(), []
+            browser = threading.Thread(target=browse_until, args=(done, product_id, latencies))
+            browser.start()
+            started = time.perf_counter()
+            response = session().post(
+                f"{BASE_URL}/admin/products/import?format={fmt}",
+                files={"file": (f"products.{fmt}", payload)},
+                headers=headers,
+            )
+            elapsed = time.perf_counter() - started
+            done.set()
+            browser.join()
+            response.raise_for_status()
+            report = response.json()
+            results.append({
+                "rows": count,
+                "format": fmt,
+                "MB": round(len(payload) / 1e6, 1),
+                "inserted": report["inserted"],
+                "updated": report["updated"],
+                "failed": report["failed"],
+                "seconds": round(elapsed, 2),
+                "rows_per_s": int(count / elapsed),
+                "get_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                "get_max_ms": round(max(latencies) * 1000, 1),
+            })
+    print_table("Bulk product import throughput", results)
+
+if __name__ == "__main__":
+    main()
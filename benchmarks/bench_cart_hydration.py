@@ -0,0 +1,41 @@
+"""GET /api/cart latency for carts of 1, 10 and 100 items.
+
+Cart hydration is a single $lookup aggregation, so latency should stay
+roughly flat as the cart grows instead of adding one round trip per line.
+Compare against a server started from the commit before the aggregation.
+
+    BENCH_ADMIN_EMAIL=... BENCH_ADMIN_PASSWORD=... python benchmarks/bench_cart_hydration.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import BASE_URL, session, run_concurrent, register_user, admin_headers, create_products, delete_products, print_table
+
+CART_SIZES = [1, 10, 100]
+CLIENTS = int(os.environ.get("BENCH_CLIENTS", "4"))
+DURATION = float(os.environ.get("BENCH_DURATION", "5"))
+
+def main() -> None:
+    admin = admin_headers()
+    product_ids = create_products(admin, max(CART_SIZES))
+    try:
+        rows = []
+        for size in CART_SIZES:
+            user = register_user("cart")
+            for product_id in product_ids[:size]:
+                session().post(f"{BASE_URL}/cart/add?product_id={product_id}&quantity=1", headers=user).raise_for_status()
+
+            def read_cart(client_index: int) -> bool:
+                response = session().get(f"{BASE_URL}/cart", headers=user)
+                return response.status_code == 200 and len(response.json()) == size
+
+            rows.append({"items": size, **run_concurrent(read_cart, CLIENTS, DURATION)})
+            session().delete(f"{BASE_URL}/cart", headers=user)
+        print_table("GET /api/cart latency by cart size", rows)
+    finally:
+        delete_products(admin, product_ids)
+
+if __name__ == "__main__":
+    main()
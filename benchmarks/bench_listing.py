@@ -0,0 +1,81 @@
+"""Time to first byte and total time for the product listing.
+
+Compares one keyset page, walking every page by X-Next-Cursor, and the
+NDJSON stream of the whole catalog. A page should stay flat as the catalog
+grows; the stream should start sending almost at once. Run it against a
+server started from the commit before pagination as well: there `limit`,
+`cursor` and `stream` are ignored and every row is the full listing.
+
+    BENCH_ADMIN_EMAIL=... BENCH_ADMIN_PASSWORD=... python benchmarks/bench_listing.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import BASE_URL, session, admin_headers, create_products, delete_products, percentile, print_table
+
+PRODUCTS = int(os.environ.get("BENCH_PRODUCTS", "1000"))
+REPEATS = int(os.environ.get("BENCH_REPEATS", "20"))
+PAGE_SIZE = 50
+
+MODES = [
+    ("page", {"limit": PAGE_SIZE}),
+    ("stream", {"stream": "true"}),
+]
+
+def fetch(params: dict) -> tuple:
+    """Return (ttfb seconds, total seconds, body bytes) for one listing request."""
+    started = time.perf_counter()
+    response = session().get(f"{BASE_URL}/products", params=params, stream=True)
+    response.raise_for_status()
+    chunks = response.iter_content(chunk_size=None)
+    first = next(chunks, b"")
+    ttfb = time.perf_counter() - started
+    size = len(first) + sum(len(chunk) for chunk in chunks)
+    return ttfb, time.perf_counter() - started, size
+
+def fetch_all_pages() -> tuple:
+    """Walk the listing by X-Next-Cursor, as the storefront does for a full export."""
+    started = time.perf_counter()
+    ttfb = None
+    size = 0
+    params = {"limit": 200}
+    while True:
+        response = session().get(f"{BASE_URL}/products", params=params)
+        response.raise_for_status()
+        if ttfb is None:
+            ttfb = time.perf_counter() - started
+        size += len(response.content)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ttfb, time.perf_counter() - started, size
+        params = {"limit": 200, "cursor": cursor}
+
+def main() -> None:
+    admin = admin_headers()
+    product_ids = create_products(admin, PRODUCTS)
+    try:
+        rows = []
+        modes = [(label, lambda params=params: fetch(params)) for label, params in MODES]
+        modes.insert(1, ("all pages", fetch_all_pages))
+        for label, request in modes:
+            ttfbs, totals, size = [], [], 0
+            for _ in range(REPEATS):
+                ttfb, total, size = request()
+                ttfbs.append(ttfb)
+                totals.append(total)
+            rows.append({
+                "mode": label,
+                "bytes": size,
+                "ttfb_p50_ms": round(percentile(ttfbs, 50) * 1000, 2),
+                "total_p50_ms": round(percentile(totals, 50) * 1000, 2),
+                "total_p95_ms": round(percentile(totals, 95) * 1000, 2),
+            })
+        print_table(f"GET {BASE_URL}/products with {PRODUCTS} extra products", rows)
+    finally:
+        delete_products(admin, product_ids)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Latency of unrelated catalog GETs while a login storm is running.
+
+Measures GET /api/products/{id} alone, then again while BENCH_STORM_CLIENTS
+threads hammer /api/auth/login. With bcrypt on the event loop the browse
+p99 jumps to the cost of a hash; with the worker pool it should barely move.
+
+    python benchmarks/bench_login_storm.py
+"""
+import os
+import sys
+import threading
+import uuid
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import BASE_URL, session, run_concurrent, print_table
+
+BROWSE_CLIENTS = int(os.environ.get("BENCH_CLIENTS", "4"))
+STORM_CLIENTS = int(os.environ.get("BENCH_STORM_CLIENTS", "32"))
+DURATION = float(os.environ.get("BENCH_DURATION", "10"))
+PASSWORD = "StormPassword123!"
+
+def main() -> None:
+    product_id = session().get(f"{BASE_URL}/products").json()[0]["id"]
+    emails = []
+    for _ in range(STORM_CLIENTS):
+        email = f"storm.{uuid.uuid4()}@example.com"
+        session().post(f"{BASE_URL}/auth/register", json={"email": email, "password": PASSWORD, "name": "Storm"}).raise_for_status()
+        emails.append(email)
+
+    def browse(client_index: int) -> bool:
+        return session().get(f"{BASE_URL}/products/{product_id}").status_code == 200
+
+    def login(client_index: int) -> bool:
+        payload = {"email": emails[client_index], "password": PASSWORD}
+        return session().post(f"{BASE_URL}/auth/login", json=payload).status_code == 200
+
+    rows = [{"scenario": "browse only", **run_concurrent(browse, BROWSE_CLIENTS, DURATION)}]
+
+    storm_result = {}
+    storm = threading.Thread(target=lambda: storm_result.update(run_concurrent(login, STORM_CLIENTS, DURATION)))
+    storm.start()
+    rows.append({"scenario": "browse+storm", **run_concurrent(browse, BROWSE_CLIENTS, DURATION)})
+    storm.join()
+    rows.append({"scenario": "login storm", **storm_result})
+
+    print_table(f"GET /products/{{id}} during a {STORM_CLIENTS}-client login storm", rows)
+    print("Login errors include 503s shed by the password hashing queue limit.")
+
+if __name__ == "__main__":
+    main()
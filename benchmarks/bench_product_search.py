@@ -0,0 +1,120 @@
+"""Text-index product search vs. the old case-insensitive $regex scan.
+
+Builds a synthetic catalog in a scratch database (BENCH_DB_NAME, default
+techhub_bench) directly through pymongo, with the indexes from
+database.INDEXES, then times both query shapes:
+
+  regex  the baseline: $regex on name or description, every match, unsorted
+  text   what GET /api/products?search= runs: the top 50 text matches by
+         relevance, topped up with name-prefix matches (see search_products)
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/bench_product_search.py
+"""
+import os
+import random
+import re
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from pymongo import MongoClient
+from database import INDEXES
+from common import percentile, print_table
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+DB_NAME = os.environ.get("BENCH_DB_NAME", "techhub_bench")
+CATALOG_SIZE = int(os.environ.get("BENCH_CATALOG_SIZE", "100000"))
+ITERATIONS = int(os.environ.get("BENCH_ITERATIONS", "50"))
+SEARCH_TERMS = ["iphone", "wireless headphones", "camera", "oled", "laptop pro", "gaming", "lapt"]
+LIMIT = 50
+CATEGORIES = ["smartphones", "audio", "laptops", "cameras", "televisions", "gaming", "wearables"]
+WORDS = [
+    "pro", "max", "ultra", "mini", "wireless", "noise", "canceling", "oled", "4k", "camera",
+    "laptop", "gaming", "smart", "portable", "premium", "headphones", "iphone", "galaxy",
+    "display", "battery", "bluetooth", "mirrorless", "speaker", "tablet", "watch",
+]
+
+def build_catalog(collection) -> None:
+    """Insert CATALOG_SIZE random products and the indexes the API uses."""
+    rng = random.Random(42)
+    collection.drop()
+    batch = []
+    for i in range(CATALOG_SIZE):
+        batch.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "name": " ".join(rng.choices(WORDS, k=3)).title(),
+            "description": " ".join(rng.choices(WORDS, k=20)),
+            "price": round(rng.uniform(5, 4000), 2),
+            "image_url": "https://example.com/product.png",
+            "category": rng.choice(CATEGORIES),
+            "stock": rng.randint(0, 500),
+            "specifications": {},
+        })
+        if len(batch) == 5000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+    collection.create_indexes(INDEXES["products"])
+
+def time_query(run) -> dict:
+    """Run a query callable ITERATIONS times and report latency percentiles."""
+    samples = []
+    for _ in range(ITERATIONS):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+    }
+
+def search(collection, query: dict, term: str) -> list:
+    """Same two queries as server.search_products."""
+    products = list(
+        collection.find({**query, "$text": {"$search": term}}, {"_id": 0})
+        .sort([("score", {"$meta": "textScore"}), ("id", 1)])
+        .limit(LIMIT)
+    )
+    if len(products) < LIMIT:
+        prefix = {"$regex": "^" + re.escape(term), "$options": "i"}
+        products += collection.find(
+            {**query, "name": prefix, "id": {"$nin": [product["id"] for product in products]}}, {"_id": 0}
+        ).sort("id", 1).limit(LIMIT - len(products))
+    return products
+
+def main() -> None:
+    collection = MongoClient(MONGO_URL)[DB_NAME].products
+    print(f"Building {CATALOG_SIZE} synthetic products in {DB_NAME}.products ...")
+    build_catalog(collection)
+
+    rows = []
+    for term in SEARCH_TERMS:
+        for category in (None, "audio"):
+            regex_query = {"$or": [
+                {"name": {"$regex": term, "$options": "i"}},
+                {"description": {"$regex": term, "$options": "i"}},
+            ]}
+            query = {}
+            if category:
+                regex_query["category"] = category
+                query["category"] = category
+            regex = time_query(lambda: list(collection.find(regex_query)))
+            text = time_query(lambda: search(collection, query, term))
+            rows.append({
+                "term": term,
+                "category": category or "-",
+                "regex_rows": collection.count_documents(regex_query),
+                "regex_p50": regex["p50_ms"],
+                "regex_p95": regex["p95_ms"],
+                "text_rows": len(search(collection, query, term)),
+                "text_p50": text["p50_ms"],
+                "text_p95": text["p95_ms"],
+            })
+    print_table(f"Search latency (ms) on {CATALOG_SIZE} products", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Sales report cost: per-document Python loop vs the vectorized reports module.
+
+Both build the same report (top products, basket-size histograms, monthly
+cohort revenue) from synthetic order documents fed in batches, as they
+would arrive from a Mongo cursor. The results are checked against each
+other, then timed, and peak traced memory is measured in a separate pass.
+
+    python benchmarks/bench_reports.py
+    BENCH_ORDERS=100000,1000000 BENCH_BATCH=20000 python benchmarks/bench_reports.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import numpy as np
+from reports import SalesReport, REPORT_MAX_BASKET, distribution, month_label
+from common import print_table
+
+ORDER_COUNTS = [int(n) for n in os.environ.get("BENCH_ORDERS", "50000,200000").split(",")]
+BATCH_SIZE = int(os.environ.get("BENCH_BATCH", "20000"))
+PRODUCTS = int(os.environ.get("BENCH_PRODUCTS", "2000"))
+USERS = int(os.environ.get("BENCH_USERS", "20000"))
+TOP = 20
+
+def make_batches(count: int):
+    """Yield lists of order documents shaped like REPORT_PROJECTION output."""
+    rng = random.Random(count)
+    products = [(str(uuid.uuid4()), f"Product {i}", round(rng.uniform(5, 2000), 2)) for i in range(PRODUCTS)]
+    users = [str(uuid.uuid4()) for _ in range(USERS)]
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(count):
+        items = []
+        for product_id, name, price in rng.sample(products, rng.randint(1, 6)):
+            quantity = rng.randint(1, 4)
+            items.append({"product_id": product_id, "name": name, "category": "bench",
+                          "price": price, "quantity": quantity, "total": price * quantity})
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "user_id": users[int(rng.paretovariate(1.2)) % USERS],
+            "created_at": start + timedelta(minutes=i * 525600 * 2 // count),
+            "status": "delivered",
+            "total_amount": sum(item["total"] for item in items),
+            "items": items,
+        })
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def loop_report(batches) -> dict:
+    """The per-document approach: dictionaries updated one order at a time."""
+    orders, revenue = 0, 0.0
+    products = {}
+    units_histogram = [0] * (REPORT_MAX_BASKET + 1)
+    lines_histogram = [0] * (REPORT_MAX_BASKET + 1)
+    user_months = defaultdict(float)
+    for batch in batches:
+        for order in batch:
+            orders += 1
+            revenue += order["total_amount"]
+            units = 0
+            for item in order["items"]:
+                product = products.setdefault(item["product_id"], {"revenue": 0.0, "units": 0, "orders": 0})
+                product["name"] = item["name"]
+                product["revenue"] += item["total"]
+                product["units"] += item["quantity"]
+                product["orders"] += 1
+                units += item["quantity"]
+            units_histogram[min(units, REPORT_MAX_BASKET)] += 1
+            lines_histogram[min(len(order["items"]), REPORT_MAX_BASKET)] += 1
+            created_at = order["created_at"]
+            user_months[order["user_id"], (created_at.year - 1970) * 12 + created_at.month - 1] += order["total_amount"]
+
+    last_month = max(month for _, month in user_months)
+    first_month = {}
+    for (user_id, month) in user_months:
+        first_month[user_id] = min(month, first_month.get(user_id, month))
+    cohorts = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+    for (user_id, month), amount in user_months.items():
+        cell = cohorts[first_month[user_id]][month - first_month[user_id]]
+        cell[0] += 1
+        cell[1] += amount
+
+    top = sorted(products.items(), key=lambda entry: -entry[1]["revenue"])[:TOP]
+    return {
+        "orders": orders,
+        "revenue": round(revenue, 2),
+        "top_products": [product_id for product_id, _ in top],
+        "units": distribution(np.array(units_histogram)),
+        "lines": distribution(np.array(lines_histogram)),
+        "cohorts": {
+            month_label(cohort): [offsets.get(i, [0, 0.0])[0] for i in range(last_month - cohort + 1)]
+            for cohort, offsets in cohorts.items()
+        },
+    }
+
+def vectorized_report(batches) -> dict:
+    report = SalesReport()
+    for batch in batches:
+        report.add(batch)
+    result = report.result(TOP)
+    return {
+        "orders": result["orders"],
+        "revenue": result["revenue"],
+        "top_products": [product["product_id"] for product in result["top_products"]],
+        "units": result["basket_size"]["units"],
+        "lines": result["basket_size"]["lines"],
+        "cohorts": {cohort["cohort"]: cohort["active_users"] for cohort in result["cohorts"]},
+    }
+
+def timed(build, batches) -> float:
+    started = time.perf_counter()
+    build(batches)
+    return time.perf_counter() - started
+
+def peak_mb(build, count: int) -> float:
+    """Peak traced memory while building from generated batches (generation included)."""
+    tracemalloc.start()
+    build(make_batches(count))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(peak / 1e6, 1)
+
+def main() -> None:
+    rows = []
+    for count in ORDER_COUNTS:
+        batches = list(make_batches(count))
+        loop, vectorized = loop_report(batches), vectorized_report(batches)
+        # Top-product order can differ only on exact revenue ties
+        assert loop["orders"] == vectorized["orders"] and loop["units"] == vectorized["units"]
+        assert loop["lines"] == vectorized["lines"] and loop["cohorts"] == vectorized["cohorts"]
+        assert set(loop["top_products"]) == set(vectorized["top_products"])
+        for name, build in (("python loop", loop_report), ("vectorized", vectorized_report)):
+            seconds = timed(build, batches)
+            rows.append({
+                "orders": count,
+                "approach": name,
+                "seconds": round(seconds, 2),
+                "orders_per_s": int(count / seconds),
+                "peak_MB": peak_mb(build, count),
+            })
+        del batches
+    print_table(f"Sales report build time ({BATCH_SIZE:,}-order batches)", rows)
+
+if __name__ == "__main__":
+    main()
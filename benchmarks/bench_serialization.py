@@ -0,0 +1,99 @@
+"""Serialization cost for 10k-product and 10k-order payloads.
+
+Compares the old response path (stringify every _id, FastAPI's
+jsonable_encoder, then json.dumps as JSONResponse does) with the shared
+response layer (documents projected without _id, encoded once by orjson).
+
+    python benchmarks/bench_serialization.py
+"""
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from responses import dumps
+from common import print_table
+
+SIZE = int(os.environ.get("BENCH_SIZE", "10000"))
+ROUNDS = int(os.environ.get("BENCH_ROUNDS", "5"))
+
+def make_products(rng: random.Random) -> list:
+    return [{
+        "_id": ObjectId(),
+        "id": str(uuid.uuid4()),
+        "name": f"Product {i}",
+        "description": "A realistic product description " * 4,
+        "price": round(rng.uniform(5, 4000), 2),
+        "image_url": "https://example.com/product.png",
+        "category": rng.choice(["smartphones", "audio", "laptops", "cameras"]),
+        "stock": rng.randint(0, 500),
+        "specifications": {"display": "6.1-inch", "storage": "128GB", "battery": "30 hours"},
+    } for i in range(SIZE)]
+
+def make_orders(rng: random.Random) -> list:
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(),
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "items": [{
+            "product_id": str(uuid.uuid4()),
+            "name": f"Product {j}",
+            "price": 99.99,
+            "quantity": rng.randint(1, 3),
+            "total": 199.98,
+        } for j in range(rng.randint(1, 5))],
+        "total_amount": round(rng.uniform(10, 5000), 2),
+        "status": rng.choice(["pending", "shipped", "delivered"]),
+        "created_at": now - timedelta(minutes=i),
+    } for i in range(SIZE)]
+
+def old_path(documents: list) -> bytes:
+    for document in documents:
+        if '_id' in document:
+            document['_id'] = str(document['_id'])
+    content = jsonable_encoder(documents)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def new_path(documents: list) -> bytes:
+    return dumps(documents)
+
+def best_of(fn, make) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        documents = make()
+        started = time.perf_counter()
+        fn(documents)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+def main() -> None:
+    rng = random.Random(7)
+    products = make_products(rng)
+    orders = make_orders(rng)
+
+    def copy(documents, keep_id=True):
+        return lambda: [{k: v for k, v in d.items() if keep_id or k != "_id"} for d in documents]
+
+    rows = []
+    for name, documents in (("products", products), ("orders", orders)):
+        old_ms = best_of(old_path, copy(documents))
+        new_ms = best_of(new_path, copy(documents, keep_id=False))
+        rows.append({
+            "payload": f"{SIZE} {name}",
+            "old_ms": round(old_ms, 1),
+            "orjson_ms": round(new_ms, 1),
+            "speedup": f"{old_ms / new_ms:.1f}x",
+        })
+    print_table("Response serialization (best of %d)" % ROUNDS, rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Throughput of catalog reads as the number of uvicorn workers grows.
+
+Starts `python server.py` from backend/ once per worker count (WEB_CONCURRENCY)
+on a scratch port, waits for it to come up, and drives GET /api/products and
+GET /api/products/{id} from several client processes so the load generator
+itself is not limited to one core.
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/bench_worker_scaling.py
+    BENCH_WORKER_COUNTS=1,2,4,8 BENCH_CLIENT_PROCESSES=8 python benchmarks/bench_worker_scaling.py
+"""
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests
+from common import session, run_concurrent, print_table
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+PORT = int(os.environ.get("BENCH_PORT", "8011"))
+BASE_URL = f"http://127.0.0.1:{PORT}/api"
+WORKER_COUNTS = [int(n) for n in os.environ.get("BENCH_WORKER_COUNTS", "1,2,4").split(",")]
+CLIENT_PROCESSES = int(os.environ.get("BENCH_CLIENT_PROCESSES", str(os.cpu_count() or 2)))
+CLIENTS_PER_PROCESS = int(os.environ.get("BENCH_CLIENTS", "8"))
+DURATION = float(os.environ.get("BENCH_DURATION", "10"))
+STARTUP_TIMEOUT = 30.0
+
+def start_server(workers: int) -> subprocess.Popen:
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(PORT), "HOST": "127.0.0.1"}
+    server = subprocess.Popen(
+        [sys.executable, "server.py"], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{BASE_URL}/categories", timeout=1).status_code == 200:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"server with {workers} workers did not start within {STARTUP_TIMEOUT}s")
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+def client_process(args) -> dict:
+    """One load-generating process; returns its run_concurrent summary."""
+    path, product_ids = args
+
+    def request(client_index: int) -> bool:
+        url = f"{BASE_URL}/products"
+        if path == "detail":
+            url += f"/{product_ids[client_index % len(product_ids)]}"
+        return session().get(url).status_code == 200
+
+    return run_concurrent(request, CLIENTS_PER_PROCESS, DURATION)
+
+def measure(path: str, product_ids) -> dict:
+    with Pool(CLIENT_PROCESSES) as pool:
+        results = pool.map(client_process, [(path, product_ids)] * CLIENT_PROCESSES)
+    return {
+        "rps": round(sum(result["rps"] for result in results), 1),
+        "errors": sum(result["errors"] for result in results),
+        # Worst client process, so a single slow worker is not averaged away
+        "p50_ms": max(result["p50_ms"] for result in results),
+        "p99_ms": max(result["p99_ms"] for result in results),
+    }
+
+def main() -> None:
+    rows = []
+    baseline = {}
+    for workers in WORKER_COUNTS:
+        server = start_server(workers)
+        try:
+            product_ids = [product["id"] for product in session().get(f"{BASE_URL}/products").json()]
+            for path in ("list", "detail"):
+                # Warm every worker's catalog cache before measuring
+                run_concurrent(lambda i: session().get(f"{BASE_URL}/products").status_code == 200, 4, 1.0)
+                result = measure(path, product_ids)
+                baseline.setdefault(path, result["rps"])
+                speedup = result["rps"] / baseline[path] if baseline[path] else 0.0
+                rows.append({"workers": workers, "route": path, **result, "speedup": round(speedup, 2)})
+        finally:
+            stop_server(server)
+
+    print_table(
+        f"Catalog throughput by worker count ({CLIENT_PROCESSES} client processes x {CLIENTS_PER_PROCESS} threads)",
+        rows,
+    )
+    print(f"Speedup is relative to {WORKER_COUNTS[0]} worker(s); the host has {os.cpu_count()} cores.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import os
+import time
+import uuid
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+# Base URL of a running backend (uvicorn server:app --port 8001)
+BASE_URL = os.environ.get("BENCH_BASE_URL", "http://localhost:8001/api")
+
+_local = threading.local()
+
+def session() -> requests.Session:
+    """Return a keep-alive session private to the calling thread."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """Turn raw per-request latencies (seconds) into an RPS/percentile summary."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+def run_concurrent(request_fn: Callable[[int], bool], clients: int, duration: float) -> Dict[str, float]:
+    """Call request_fn from `clients` threads for `duration` seconds.
+
+    request_fn receives the client index and returns True on success.
+    """
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(client_index: int) -> None:
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = request_fn(client_index)
+            except requests.RequestException:
+                ok = False
+            if ok:
+                local_latencies.append(time.perf_counter() - started)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(worker, range(clients)))
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+class RouteRecorder:
+    """Collects latencies and errors per route label across client threads."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def request(self, label: str, method: str, url: str,
+                expected: Tuple[int, ...] = (200,), **kwargs) -> Optional[requests.Response]:
+        """Send one request, recording it under `label` (e.g. "GET /api/products/{id}")."""
+        started = time.perf_counter()
+        try:
+            response = session().request(method, url, **kwargs)
+        except requests.RequestException:
+            response = None
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            if response is not None and response.status_code in expected:
+                self.latencies[label].append(elapsed)
+            else:
+                self.errors[label] += 1
+        return response
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        labels = sorted(set(self.latencies) | set(self.errors))
+        return {label: summarize(self.latencies[label], self.errors[label], elapsed) for label in labels}
+
+def run_scenario(scenario: Callable[[int], None], clients: int, duration: float) -> float:
+    """Run scenario(client_index) in a loop from `clients` threads; returns elapsed seconds."""
+    deadline = time.perf_counter() + duration
+
+    def worker(client_index: int) -> None:
+        while time.perf_counter() < deadline:
+            scenario(client_index)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(worker, range(clients)))
+    return time.perf_counter() - started
+
+def register_user(prefix: str = "bench") -> Dict[str, str]:
+    """Register a throwaway user and return its auth headers."""
+    payload = {
+        "email": f"{prefix}.{uuid.uuid4()}@example.com",
+        "password": "BenchPassword123!",
+        "name": "Bench User",
+    }
+    response = session().post(f"{BASE_URL}/auth/register", json=payload)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def admin_headers() -> Dict[str, str]:
+    """Log in with BENCH_ADMIN_EMAIL / BENCH_ADMIN_PASSWORD and return auth headers."""
+    payload = {
+        "email": os.environ["BENCH_ADMIN_EMAIL"],
+        "password": os.environ["BENCH_ADMIN_PASSWORD"],
+    }
+    response = session().post(f"{BASE_URL}/auth/login", json=payload)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def create_products(headers: Dict[str, str], count: int, category: str = "bench") -> List[str]:
+    """Create `count` throwaway products through the admin API and return their ids."""
+    product_ids = []
+    for i in range(count):
+        payload = {
+            "name": f"Bench Product {i}",
+            "description": "Synthetic product created by the benchmark suite",
+            "price": 10.0 + i,
+            "image_url": "https://example.com/bench.png",
+            "category": category,
+            "stock": 1000000,
+            "specifications": {"index": str(i)},
+        }
+        response = session().post(f"{BASE_URL}/admin/products", json=payload, headers=headers)
+        response.raise_for_status()
+        product_ids.append(response.json()["product_id"])
+    return product_ids
+
+def delete_products(headers: Dict[str, str], product_ids: List[str]) -> None:
+    """Remove products created by create_products."""
+    for product_id in product_ids:
+        session().delete(f"{BASE_URL}/admin/products/{product_id}", headers=headers)
+
+def print_table(title: str, rows: List[Dict[str, float]], key: Optional[str] = None) -> None:
+    """Print benchmark rows as a fixed-width table."""
+    print(f"\n{'=' * 80}")
+    print(title)
+    print(f"{'=' * 80}")
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    print(" | ".join(f"{column:>10}" for column in columns))
+    print("-" * 80)
+    for row in rows:
+        print(" | ".join(f"{str(row[column]):>10}" for column in columns))
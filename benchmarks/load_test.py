@@ -0,0 +1,169 @@
+"""Concurrent load-test suite for the API with per-route latency reporting.
+
+Drives a running backend through five scenarios and reports RPS and
+p50/p95/p99 per route. Results are written as JSON so runs can be compared
+across commits.
+
+    BENCH_ADMIN_EMAIL=... BENCH_ADMIN_PASSWORD=... python benchmarks/load_test.py
+    python benchmarks/load_test.py --scenarios browse,search --clients 32
+    python benchmarks/load_test.py --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import (
+    BASE_URL,
+    RouteRecorder,
+    admin_headers,
+    create_products,
+    delete_products,
+    print_table,
+    register_user,
+    run_scenario,
+    session,
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SEARCH_TERMS = ["iphone", "camera", "oled", "headphones", "laptop", "wireless", "pro"]
+SCENARIOS = ["browse", "search", "cart", "checkout", "admin"]
+
+class Fixture:
+    """Users, products and admin credentials shared by the scenarios."""
+
+    def __init__(self, users: int) -> None:
+        self.admin = admin_headers()
+        self.product_ids = create_products(self.admin, 20, category="bench-load")
+        catalog = session().get(f"{BASE_URL}/products?limit=200").json()
+        self.browse_ids = [product["id"] for product in catalog] or self.product_ids
+        self.categories = session().get(f"{BASE_URL}/categories").json()
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            self.users = list(pool.map(lambda _: register_user("load"), range(users)))
+
+    def close(self) -> None:
+        delete_products(self.admin, self.product_ids)
+
+def browse(fx: Fixture, rec: RouteRecorder):
+    def scenario(client_index: int) -> None:
+        rng = random.Random()
+        rec.request("GET /api/products", "GET", f"{BASE_URL}/products")
+        rec.request("GET /api/products?category", "GET", f"{BASE_URL}/products",
+                    params={"category": rng.choice(fx.categories)} if fx.categories else {})
+        rec.request("GET /api/products/{id}", "GET", f"{BASE_URL}/products/{rng.choice(fx.browse_ids)}")
+        rec.request("GET /api/categories", "GET", f"{BASE_URL}/categories")
+    return scenario
+
+def search(fx: Fixture, rec: RouteRecorder):
+    def scenario(client_index: int) -> None:
+        rec.request("GET /api/products?search", "GET", f"{BASE_URL}/products",
+                    params={"search": random.choice(SEARCH_TERMS)})
+    return scenario
+
+def cart(fx: Fixture, rec: RouteRecorder):
+    def scenario(client_index: int) -> None:
+        headers = fx.users[client_index % len(fx.users)]
+        product_id = random.choice(fx.product_ids)
+        rec.request("POST /api/cart/add", "POST", f"{BASE_URL}/cart/add",
+                    params={"product_id": product_id, "quantity": 1}, headers=headers)
+        rec.request("POST /api/cart/batch", "POST", f"{BASE_URL}/cart/batch", headers=headers, json={"operations": [
+            {"op": "set", "product_id": random.choice(fx.product_ids), "quantity": 2},
+            {"op": "remove", "product_id": product_id},
+        ]})
+        rec.request("GET /api/cart", "GET", f"{BASE_URL}/cart", headers=headers)
+        rec.request("DELETE /api/cart", "DELETE", f"{BASE_URL}/cart", headers=headers)
+    return scenario
+
+def checkout(fx: Fixture, rec: RouteRecorder):
+    def scenario(client_index: int) -> None:
+        headers = fx.users[client_index % len(fx.users)]
+        rec.request("POST /api/cart/add", "POST", f"{BASE_URL}/cart/add",
+                    params={"product_id": random.choice(fx.product_ids), "quantity": 1}, headers=headers)
+        rec.request("POST /api/orders", "POST", f"{BASE_URL}/orders", headers=headers)
+        rec.request("GET /api/orders", "GET", f"{BASE_URL}/orders", headers=headers)
+    return scenario
+
+def admin(fx: Fixture, rec: RouteRecorder):
+    def scenario(client_index: int) -> None:
+        rec.request("GET /api/admin/dashboard", "GET", f"{BASE_URL}/admin/dashboard", headers=fx.admin)
+        page = rec.request("GET /api/admin/orders", "GET", f"{BASE_URL}/admin/orders", headers=fx.admin)
+        next_cursor = page.headers.get("X-Next-Cursor") if page is not None else None
+        if next_cursor:
+            rec.request("GET /api/admin/orders?cursor", "GET", f"{BASE_URL}/admin/orders",
+                        params={"cursor": next_cursor}, headers=fx.admin)
+        rec.request("GET /api/admin/users", "GET", f"{BASE_URL}/admin/users", headers=fx.admin)
+    return scenario
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(current: dict, baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    rows = []
+    for scenario, routes in current["scenarios"].items():
+        for route, stats in routes.items():
+            before = baseline.get("scenarios", {}).get(scenario, {}).get(route)
+            if not before:
+                continue
+            rows.append({
+                "scenario": scenario,
+                "route": route,
+                "rps": f"{before['rps']} -> {stats['rps']}",
+                "p95_ms": f"{before['p95_ms']} -> {stats['p95_ms']}",
+                "p99_ms": f"{before['p99_ms']} -> {stats['p99_ms']}",
+            })
+    print_table(f"Compared with {baseline.get('commit')} ({baseline_path})", rows)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to diff against")
+    args = parser.parse_args()
+
+    fixture = Fixture(args.users)
+    builders = {"browse": browse, "search": search, "cart": cart, "checkout": checkout, "admin": admin}
+    result = {
+        "commit": git_commit(),
+        "started_at": datetime.utcnow().isoformat(),
+        "base_url": BASE_URL,
+        "clients": args.clients,
+        "duration": args.duration,
+        "scenarios": {},
+    }
+    try:
+        for name in args.scenarios.split(","):
+            recorder = RouteRecorder()
+            elapsed = run_scenario(builders[name](fixture, recorder), args.clients, args.duration)
+            routes = recorder.summary(elapsed)
+            result["scenarios"][name] = routes
+            print_table(f"Scenario: {name} ({args.clients} clients, {args.duration}s)",
+                        [{"route": route, **stats} for route, stats in routes.items()])
+    finally:
+        fixture.close()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{result['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Oversell stress test: hundreds of parallel checkouts against one product.
+
+Creates a product with BENCH_STOCK units, gives BENCH_BUYERS users one unit
+each in their cart, then fires every checkout at once. Exactly BENCH_STOCK
+orders must succeed, the rest must get 409, and stock must end at zero.
+
+    BENCH_ADMIN_EMAIL=... BENCH_ADMIN_PASSWORD=... python benchmarks/stress_checkout.py
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from common import BASE_URL, session, register_user, admin_headers, print_table
+
+STOCK = int(os.environ.get("BENCH_STOCK", "50"))
+BUYERS = int(os.environ.get("BENCH_BUYERS", "300"))
+
+def main() -> None:
+    admin = admin_headers()
+    payload = {
+        "name": "Limited Edition Stress Product",
+        "description": "Created by the checkout stress test",
+        "price": 99.0,
+        "image_url": "https://example.com/limited.png",
+        "category": "bench",
+        "stock": STOCK,
+    }
+    response = session().post(f"{BASE_URL}/admin/products", json=payload, headers=admin)
+    response.raise_for_status()
+    product_id = response.json()["product_id"]
+
+    try:
+        print(f"Registering {BUYERS} buyers ...")
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            buyers = list(pool.map(lambda _: register_user("stress"), range(BUYERS)))
+        for headers in buyers:
+            session().post(f"{BASE_URL}/cart/add?product_id={product_id}&quantity=1", headers=headers).raise_for_status()
+
+        barrier = threading.Barrier(BUYERS)
+
+        def checkout(headers) -> int:
+            barrier.wait()
+            return session().post(f"{BASE_URL}/orders", headers=headers).status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=BUYERS) as pool:
+            statuses = list(pool.map(checkout, buyers))
+        elapsed = time.perf_counter() - started
+
+        final_stock = session().get(f"{BASE_URL}/products/{product_id}").json()["stock"]
+        succeeded = statuses.count(200)
+        rejected = statuses.count(409)
+        print_table("Parallel checkout of a single limited product", [{
+            "buyers": BUYERS,
+            "stock": STOCK,
+            "orders": succeeded,
+            "rejected": rejected,
+            "other": BUYERS - succeeded - rejected,
+            "left": final_stock,
+            "seconds": round(elapsed, 2),
+        }])
+        oversold = succeeded > STOCK or final_stock < 0
+        consistent = final_stock == STOCK - succeeded
+        print("OVERSOLD" if oversold else "No oversell", "|", "stock consistent" if consistent else "STOCK MISMATCH")
+        sys.exit(0 if not oversold and consistent else 1)
+    finally:
+        session().delete(f"{BASE_URL}/admin/products/{product_id}", headers=admin)
+
+if __name__ == "__main__":
+    main()
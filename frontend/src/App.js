@@ -14,7 +14,7 @@ const API_BASE_URL =
   process.env.REACT_APP_BACKEND_URL || "http://localhost:8001";
 
 // API helper functions
-const apiCall = async (endpoint, options = {}) => {
+const apiFetch = async (endpoint, options = {}) => {
   const token = localStorage.getItem("token");
   const config = {
     headers: {
@@ -35,10 +35,45 @@ const apiCall = async (endpoint, options = {}) => {
     throw new Error(error.detail || "API request failed");
   }
 
+  return response;
+};
+
+const apiCall = async (endpoint, options = {}) => {
+  const response = await apiFetch(endpoint, options);
   return response.json();
 };
 
+// Lists such as /api/products and /api/admin/orders return one page at a
+// time; the cursor for the next page comes back in X-Next-Cursor and is
+// null on the last page
+const apiPage = async (endpoint, cursor = null) => {
+  const separator = endpoint.includes("?") ? "&" : "?";
+  const response = await apiFetch(
+    cursor ? `${endpoint}${separator}cursor=${encodeURIComponent(cursor)}` : endpoint
+  );
+  return {
+    items: await response.json(),
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  };
+};
+
 // Components
+const LoadMoreButton = ({ cursor, loading, onClick }) => {
+  if (!cursor) return null;
+
+  return (
+    <div className="flex justify-center mt-6">
+      <button
+        onClick={onClick}
+        disabled={loading}
+        className="px-6 py-2 border border-gray-300 rounded-md text-gray-700 hover:bg-gray-50 disabled:opacity-50"
+      >
+        {loading ? "Loading..." : "Load more"}
+      </button>
+    </div>
+  );
+};
+
 const Header = ({ currentView, setCurrentView }) => {
   const { user, logout } = useAuth();
   const { cartItems } = useCart();
@@ -228,6 +263,8 @@ const ProductsView = () => {
   const [selectedCategory, setSelectedCategory] = useState("");
   const [searchTerm, setSearchTerm] = useState("");
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const { addToCart } = useCart();
 
   useEffect(() => {
@@ -235,18 +272,22 @@ const ProductsView = () => {
     fetchCategories();
   }, [selectedCategory, searchTerm]);
 
-  const fetchProducts = async () => {
+  const fetchProducts = async (cursor = null) => {
+    if (cursor) setLoadingMore(true);
     try {
       const params = new URLSearchParams();
       if (selectedCategory) params.append("category", selectedCategory);
       if (searchTerm) params.append("search", searchTerm);
+      params.append("fields", "id,name,description,price,image_url,category,stock");
 
-      const data = await apiCall(`/api/products?${params}`);
-      setProducts(data);
+      const page = await apiPage(`/api/products?${params}`, cursor);
+      setProducts(cursor ? (current) => [...current, ...page.items] : page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error("Error fetching products:", error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -306,6 +347,12 @@ const ProductsView = () => {
         ))}
       </div>
 
+      <LoadMoreButton
+        cursor={nextCursor}
+        loading={loadingMore}
+        onClick={() => fetchProducts(nextCursor)}
+      />
+
       {products.length === 0 && (
         <div className="text-center py-12">
           <p className="text-gray-500 text-lg">No products found.</p>
@@ -320,7 +367,8 @@ const CartView = () => {
   const [loading, setLoading] = useState(false);
 
   const total = cartItems.reduce(
-    (sum, item) => sum + item.product.price * item.quantity,
+    (sum, item) =>
+      item.available ? sum + item.product.price * item.quantity : sum,
     0
   );
 
@@ -358,79 +406,109 @@ const CartView = () => {
             key={item.id}
             className="flex items-center py-4 border-b border-gray-200 last:border-b-0"
           >
-            <img
-              src={item.product.image_url}
-              alt={item.product.name}
-              className="w-16 h-16 object-cover rounded-md mr-4"
-            />
-            <div className="flex-1">
-              <h3 className="font-semibold text-gray-900">
-                {item.product.name}
-              </h3>
-              <p className="text-gray-600">${item.product.price}</p>
-            </div>
-            <div className="flex items-center space-x-2">
-              <button
-                onClick={() => updateCartItem(item.id, item.quantity - 1)}
-                className="p-1 rounded-md hover:bg-gray-100"
-              >
-                <svg
-                  className="w-4 h-4"
-                  fill="none"
-                  stroke="currentColor"
-                  viewBox="0 0 24 24"
-                >
-                  <path
-                    strokeLinecap="round"
-                    strokeLinejoin="round"
-                    strokeWidth={2}
-                    d="M20 12H4"
-                  />
-                </svg>
-              </button>
-              <span className="w-8 text-center">{item.quantity}</span>
-              <button
-                onClick={() => updateCartItem(item.id, item.quantity + 1)}
-                className="p-1 rounded-md hover:bg-gray-100"
-              >
-                <svg
-                  className="w-4 h-4"
-                  fill="none"
-                  stroke="currentColor"
-                  viewBox="0 0 24 24"
-                >
-                  <path
-                    strokeLinecap="round"
-                    strokeLinejoin="round"
-                    strokeWidth={2}
-                    d="M12 6v6m0 0v6m0-6h6m-6 0H6"
-                  />
-                </svg>
-              </button>
-              <button
-                onClick={() => removeFromCart(item.id)}
-                className="p-1 text-red-500 hover:bg-red-50 rounded-md ml-4"
-              >
-                <svg
-                  className="w-4 h-4"
-                  fill="none"
-                  stroke="currentColor"
-                  viewBox="0 0 24 24"
+            {item.available ? (
+              <>
+                <img
+                  src={item.product.image_url}
+                  alt={item.product.name}
+                  className="w-16 h-16 object-cover rounded-md mr-4"
+                />
+                <div className="flex-1">
+                  <h3 className="font-semibold text-gray-900">
+                    {item.product.name}
+                  </h3>
+                  <p className="text-gray-600">${item.product.price}</p>
+                </div>
+                <div className="flex items-center space-x-2">
+                  <button
+                    onClick={() => updateCartItem(item.id, item.quantity - 1)}
+                    className="p-1 rounded-md hover:bg-gray-100"
+                  >
+                    <svg
+                      className="w-4 h-4"
+                      fill="none"
+                      stroke="currentColor"
+                      viewBox="0 0 24 24"
+                    >
+                      <path
+                        strokeLinecap="round"
+                        strokeLinejoin="round"
+                        strokeWidth={2}
+                        d="M20 12H4"
+                      />
+                    </svg>
+                  </button>
+                  <span className="w-8 text-center">{item.quantity}</span>
+                  <button
+                    onClick={() => updateCartItem(item.id, item.quantity + 1)}
+                    className="p-1 rounded-md hover:bg-gray-100"
+                  >
+                    <svg
+                      className="w-4 h-4"
+                      fill="none"
+                      stroke="currentColor"
+                      viewBox="0 0 24 24"
+                    >
+                      <path
+                        strokeLinecap="round"
+                        strokeLinejoin="round"
+                        strokeWidth={2}
+                        d="M12 6v6m0 0v6m0-6h6m-6 0H6"
+                      />
+                    </svg>
+                  </button>
+                  <button
+                    onClick={() => removeFromCart(item.id)}
+                    className="p-1 text-red-500 hover:bg-red-50 rounded-md ml-4"
+                  >
+                    <svg
+                      className="w-4 h-4"
+                      fill="none"
+                      stroke="currentColor"
+                      viewBox="0 0 24 24"
+                    >
+                      <path
+                        strokeLinecap="round"
+                        strokeLinejoin="round"
+                        strokeWidth={2}
+                        d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"
+                      />
+                    </svg>
+                  </button>
+                </div>
+                <div className="text-right ml-4">
+                  <p className="font-semibold">
+                    ${(item.product.price * item.quantity).toFixed(2)}
+                  </p>
+                </div>
+              </>
+            ) : (
+              <>
+                <div className="flex-1">
+                  <p className="text-gray-500">
+                    This product is no longer available
+                  </p>
+                </div>
+                <button
+                  onClick={() => removeFromCart(item.id)}
+                  className="p-1 text-red-500 hover:bg-red-50 rounded-md ml-4"
                 >
-                  <path
-                    strokeLinecap="round"
-                    strokeLinejoin="round"
-                    strokeWidth={2}
-                    d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"
-                  />
-                </svg>
-              </button>
-            </div>
-            <div className="text-right ml-4">
-              <p className="font-semibold">
-                ${(item.product.price * item.quantity).toFixed(2)}
-              </p>
-            </div>
+                  <svg
+                    className="w-4 h-4"
+                    fill="none"
+                    stroke="currentColor"
+                    viewBox="0 0 24 24"
+                  >
+                    <path
+                      strokeLinecap="round"
+                      strokeLinejoin="round"
+                      strokeWidth={2}
+                      d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"
+                    />
+                  </svg>
+                </button>
+              </>
+            )}
           </div>
         ))}
 
@@ -558,19 +636,24 @@ const LoginView = ({ setCurrentView }) => {
 const OrdersView = () => {
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchOrders();
   }, []);
 
-  const fetchOrders = async () => {
+  const fetchOrders = async (cursor = null) => {
+    if (cursor) setLoadingMore(true);
     try {
-      const data = await apiCall("/api/orders");
-      setOrders(data);
+      const page = await apiPage("/api/orders", cursor);
+      setOrders(cursor ? (current) => [...current, ...page.items] : page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error("Error fetching orders:", error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -638,6 +721,12 @@ const OrdersView = () => {
           ))}
         </div>
       )}
+
+      <LoadMoreButton
+        cursor={nextCursor}
+        loading={loadingMore}
+        onClick={() => fetchOrders(nextCursor)}
+      />
     </div>
   );
 };
@@ -649,6 +738,9 @@ const AdminView = () => {
   const [orders, setOrders] = useState([]);
   const [users, setUsers] = useState([]);
   const [loading, setLoading] = useState(false);
+  // Next-page cursors for the products, orders and users tables
+  const [cursors, setCursors] = useState({});
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showProductForm, setShowProductForm] = useState(false);
   const [editingProduct, setEditingProduct] = useState(null);
   const [productForm, setProductForm] = useState({
@@ -685,39 +777,48 @@ const AdminView = () => {
     }
   };
 
-  const fetchProducts = async () => {
-    setLoading(true);
+  const fetchProducts = async (cursor = null) => {
+    if (cursor) setLoadingMore(true);
+    else setLoading(true);
     try {
-      const data = await apiCall("/api/products");
-      setProducts(data);
+      const page = await apiPage("/api/products?fields=*", cursor);
+      setProducts(cursor ? (current) => [...current, ...page.items] : page.items);
+      setCursors((current) => ({ ...current, products: page.nextCursor }));
     } catch (error) {
       console.error("Error fetching products:", error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
-  const fetchOrders = async () => {
-    setLoading(true);
+  const fetchOrders = async (cursor = null) => {
+    if (cursor) setLoadingMore(true);
+    else setLoading(true);
     try {
-      const data = await apiCall("/api/admin/orders");
-      setOrders(data);
+      const page = await apiPage("/api/admin/orders", cursor);
+      setOrders(cursor ? (current) => [...current, ...page.items] : page.items);
+      setCursors((current) => ({ ...current, orders: page.nextCursor }));
     } catch (error) {
       console.error("Error fetching orders:", error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
-  const fetchUsers = async () => {
-    setLoading(true);
+  const fetchUsers = async (cursor = null) => {
+    if (cursor) setLoadingMore(true);
+    else setLoading(true);
     try {
-      const data = await apiCall("/api/admin/users");
-      setUsers(data);
+      const page = await apiPage("/api/admin/users", cursor);
+      setUsers(cursor ? (current) => [...current, ...page.items] : page.items);
+      setCursors((current) => ({ ...current, users: page.nextCursor }));
     } catch (error) {
       console.error("Error fetching users:", error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -1072,6 +1173,12 @@ const AdminView = () => {
           </tbody>
         </table>
       </div>
+
+      <LoadMoreButton
+        cursor={cursors.products}
+        loading={loadingMore}
+        onClick={() => fetchProducts(cursors.products)}
+      />
     </div>
   );
 
@@ -1158,6 +1265,12 @@ const AdminView = () => {
           </tbody>
         </table>
       </div>
+
+      <LoadMoreButton
+        cursor={cursors.orders}
+        loading={loadingMore}
+        onClick={() => fetchOrders(cursors.orders)}
+      />
     </div>
   );
 
@@ -1211,6 +1324,12 @@ const AdminView = () => {
           </tbody>
         </table>
       </div>
+
+      <LoadMoreButton
+        cursor={cursors.users}
+        loading={loadingMore}
+        onClick={() => fetchUsers(cursors.users)}
+      />
     </div>
   );
 
@@ -1282,7 +1401,12 @@ const AuthProvider = ({ children }) => {
     setUser(userData);
   };
 
-  const logout = () => {
+  const logout = async () => {
+    try {
+      await apiCall("/api/auth/logout", { method: "POST" });
+    } catch (error) {
+      console.error("Error revoking session:", error);
+    }
     localStorage.removeItem("token");
     setUser(null);
   };
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+# Starts a throwaway replica set with local mongod binaries and checks that
+# reads are routed as database.py promises:
+#   - catalog / admin-report handles are served by a secondary
+#   - cart, order and auth handles are served by the primary and read their own writes
+#
+#   python replica_set_test.py               # three nodes
+#   REPLICA_TEST_NODES=1 python replica_set_test.py
+MONGOD = os.environ.get("MONGOD_BIN", "mongod")
+NODES = int(os.environ.get("REPLICA_TEST_NODES", "3"))
+BASE_PORT = int(os.environ.get("REPLICA_TEST_PORT", "27117"))
+REPLICA_SET = "rs_routing_test"
+STARTUP_TIMEOUT = 60.0
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+
+class ServedBy(monitoring.CommandListener):
+    """Remembers which server answered each command on a collection."""
+
+    def __init__(self):
+        self.addresses: Dict[str, List[tuple]] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if isinstance(collection, str):
+            self.addresses.setdefault(collection, []).append(event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def last(self, collection: str) -> Optional[tuple]:
+        served = self.addresses.get(collection)
+        return served[-1] if served else None
+
+
+served_by = ServedBy()
+
+
+def print_test_header(test_name: str) -> None:
+    """Print a formatted test header."""
+    print(f"\n{'=' * 80}")
+    print(f"TEST: {test_name}")
+    print(f"{'=' * 80}")
+
+
+def start_replica_set(root: str) -> List[subprocess.Popen]:
+    """Launch NODES mongod processes and initiate them as one replica set."""
+    processes = []
+    ports = [BASE_PORT + i for i in range(NODES)]
+    for port in ports:
+        dbpath = os.path.join(root, str(port))
+        os.makedirs(dbpath)
+        processes.append(subprocess.Popen(
+            [MONGOD, "--replSet", REPLICA_SET, "--port", str(port), "--bind_ip", "127.0.0.1",
+             "--dbpath", dbpath, "--oplogSize", "64"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ))
+
+    seed = MongoClient(f"mongodb://127.0.0.1:{ports[0]}/?directConnection=true", serverSelectionTimeoutMS=STARTUP_TIMEOUT * 1000)
+    seed.admin.command("replSetInitiate", {
+        "_id": REPLICA_SET,
+        "members": [
+            # The first node always wins the election so the test knows the primary
+            {"_id": i, "host": f"127.0.0.1:{port}", "priority": 2 if i == 0 else 1}
+            for i, port in enumerate(ports)
+        ],
+    })
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        states = [member["stateStr"] for member in seed.admin.command("replSetGetStatus")["members"]]
+        if states.count("PRIMARY") == 1 and states.count("SECONDARY") == NODES - 1:
+            seed.close()
+            return processes
+        time.sleep(0.5)
+    raise RuntimeError(f"replica set did not become healthy: {states}")
+
+
+def stop_replica_set(processes: List[subprocess.Popen]) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def test_primary_read_your_writes(database) -> bool:
+    print_test_header("Cart/order/auth handles read their own writes on the primary")
+    client = database.get_client()
+    item = {"id": str(uuid.uuid4()), "user_id": "routing-test", "product_id": "p", "quantity": 1}
+    await database.cart_collection.insert_one(item)
+    found = await database.cart_collection.find_one({"id": item["id"]})
+    address = served_by.last("cart")
+    print(f"Read served by {address}, primary is {client.delegate.primary}")
+    return found is not None and address == client.delegate.primary
+
+
+async def test_replica_reads(database) -> bool:
+    print_test_header("Catalog and admin-report handles read from a secondary")
+    client = database.get_client()
+    results = []
+    for handle in (database.products_replica_collection, database.orders_replica_collection,
+                   database.users_replica_collection):
+        await handle.find_one({})
+        address = served_by.last(handle.name)
+        # With a single node secondaryPreferred falls back to the primary
+        expected = client.delegate.secondaries if NODES > 1 else {client.delegate.primary}
+        print(f"{handle.name}: served by {address}, expected one of {expected}")
+        results.append(address in expected)
+    return all(results)
+
+
+async def test_catalog_reads_after_change(server) -> bool:
+    print_test_header("Catalog reads go to the primary right after a catalog change")
+    server.catalog_cache.clear()
+    return server.catalog_reads() is server.products_collection
+
+
+async def test_transactions(database) -> bool:
+    print_test_header("Transactions are detected on the replica set")
+    return await database.supports_transactions()
+
+
+async def run_all_tests(database, server) -> Dict[str, bool]:
+    results = {}
+    for name, test, argument in [
+        ("Primary read-your-writes", test_primary_read_your_writes, database),
+        ("Replica reads", test_replica_reads, database),
+        ("Catalog reads after change", test_catalog_reads_after_change, server),
+        ("Transactions supported", test_transactions, database),
+    ]:
+        try:
+            results[name] = await test(argument)
+        except PyMongoError as e:
+            print(f"Error: {e}")
+            results[name] = False
+    database.close()
+    return results
+
+
+def print_summary(results: Dict[str, bool]) -> None:
+    """Print a summary of test results."""
+    print("\n" + "=" * 80)
+    print("TEST SUMMARY")
+    print("=" * 80)
+    for test_name, result in results.items():
+        print(f"{test_name}: {'✅ PASSED' if result else '❌ FAILED'}")
+    passed = sum(results.values())
+    print("-" * 80)
+    print(f"TOTAL: {len(results)} | PASSED: {passed} | FAILED: {len(results) - passed}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    print(f"Starting {NODES}-node replica set routing tests")
+    root = tempfile.mkdtemp(prefix="techhub-rs-")
+    processes = start_replica_set(root)
+    try:
+        hosts = ",".join(f"127.0.0.1:{BASE_PORT + i}" for i in range(NODES))
+        os.environ["MONGO_URL"] = f"mongodb://{hosts}/?replicaSet={REPLICA_SET}"
+        os.environ.setdefault("MONGO_DB_NAME", "techhub_routing_test")
+        monitoring.register(served_by)
+        sys.path.insert(0, BACKEND_DIR)
+        import database
+        import server
+        results = asyncio.run(run_all_tests(database, server))
+    finally:
+        stop_replica_set(processes)
+        shutil.rmtree(root, ignore_errors=True)
+    print_summary(results)
+    sys.exit(0 if all(results.values()) else 1)
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import HTTPException
+
+from fields import (
+    ORDER_FIELDS,
+    PRODUCT_FIELDS,
+    PRODUCT_SUMMARY,
+    build_projection,
+    pick,
+    select_fields,
+)
+
+FULL = {"_id": 0}
+
+
+def test_select_fields_defaults():
+    assert select_fields(None, PRODUCT_FIELDS) is None
+    assert select_fields(None, PRODUCT_FIELDS, PRODUCT_SUMMARY) == PRODUCT_SUMMARY
+
+
+def test_select_fields_star_selects_full_document():
+    assert select_fields(" * ", PRODUCT_FIELDS, PRODUCT_SUMMARY) is None
+
+
+def test_select_fields_normalizes():
+    assert select_fields("price, name,,price ", PRODUCT_FIELDS) == ("name", "price")
+
+
+@pytest.mark.parametrize("fields, detail", [
+    ("name,password", "Unknown fields: password"),
+    ("$where,name", "Unknown fields: $where"),
+    (" , ", "No fields requested"),
+    ("", "No fields requested"),
+])
+def test_select_fields_rejects(fields, detail):
+    with pytest.raises(HTTPException) as error:
+        select_fields(fields, PRODUCT_FIELDS)
+    assert error.value.status_code == 400
+    assert error.value.detail == detail
+
+
+def test_build_projection_full_document():
+    projection = build_projection(None, FULL, required=("id",))
+    assert projection == FULL and projection is not FULL
+
+
+def test_build_projection_adds_required_fields():
+    assert build_projection(("name",), FULL, required=("id", "created_at")) == {
+        "_id": 0, "created_at": 1, "id": 1, "name": 1,
+    }
+
+
+def test_build_projection_drops_sub_paths_of_whole_fields():
+    selected = select_fields("items,items.name,status", ORDER_FIELDS)
+    assert build_projection(selected, FULL) == {"_id": 0, "items": 1, "status": 1}
+
+
+def test_build_projection_keeps_sub_paths_alone():
+    selected = select_fields("items.name,items.quantity", ORDER_FIELDS)
+    assert build_projection(selected, FULL, required=("id",)) == {
+        "_id": 0, "id": 1, "items.name": 1, "items.quantity": 1,
+    }
+
+
+def test_pick():
+    document = {"id": "1", "name": "n", "price": 2.0}
+    assert pick(document, None) is document
+    assert pick(document, ("name", "stock")) == {"name": "n"}
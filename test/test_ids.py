@@ -0,0 +1,64 @@
+import uuid
+
+import ids
+from ids import uuid7
+
+
+def fields(value: str) -> tuple:
+    """(timestamp_ms, version, rand_a, variant) of a UUIDv7 string."""
+    number = uuid.UUID(value).int
+    return number >> 80, (number >> 76) & 0xF, (number >> 64) & 0xFFF, (number >> 62) & 0b11
+
+
+def freeze_clock(monkeypatch, *ms_values):
+    readings = iter(ms_values)
+    monkeypatch.setattr(ids, "_last_ms", 0)
+    monkeypatch.setattr(ids, "_sequence", 0)
+    monkeypatch.setattr(ids.time, "time_ns", lambda: next(readings) * 1_000_000)
+
+
+def test_version_and_variant_bits():
+    for _ in range(100):
+        value = uuid7()
+        parsed = uuid.UUID(value)
+        assert parsed.version == 7
+        assert parsed.variant == uuid.RFC_4122
+        assert fields(value)[1] == 7 and fields(value)[3] == 0b10
+
+
+def test_timestamp_prefix(monkeypatch):
+    freeze_clock(monkeypatch, 1_700_000_000_123)
+    assert fields(uuid7())[0] == 1_700_000_000_123
+
+
+def test_same_millisecond_counts_up(monkeypatch):
+    freeze_clock(monkeypatch, *([1_700_000_000_000] * 50))
+    values = [uuid7() for _ in range(50)]
+    assert values == sorted(values) and len(set(values)) == 50
+    assert [fields(value)[2] for value in values] == list(range(50))
+
+
+def test_clock_stepping_back_stays_ordered(monkeypatch):
+    freeze_clock(monkeypatch, 1_700_000_000_500, 1_700_000_000_100, 1_700_000_000_600)
+    values = [uuid7() for _ in range(3)]
+    assert values == sorted(values)
+    assert [fields(value)[0] for value in values] == [1_700_000_000_500, 1_700_000_000_500, 1_700_000_000_600]
+
+
+def test_sequence_overflow_moves_to_next_millisecond(monkeypatch):
+    freeze_clock(monkeypatch, *([1_700_000_000_000] * 0x1001))
+    values = [uuid7() for _ in range(0x1001)]
+    assert values == sorted(values)
+    timestamp_ms, _, rand_a, _ = fields(values[-1])
+    assert (timestamp_ms, rand_a) == (1_700_000_000_001, 0)
+
+
+def test_ids_sort_by_time_as_strings():
+    earlier = uuid7(1_600_000_000_000, 0x3FF_FFFF_FFFF_FFFF_FFFF)
+    later = uuid7(1_600_000_000_001, 0)
+    assert earlier < later
+
+
+def test_explicit_arguments_are_deterministic():
+    assert uuid7(1_650_000_000_000, 12345) == uuid7(1_650_000_000_000, 12345)
+    assert fields(uuid7(1_650_000_000_000, 12345))[0] == 1_650_000_000_000
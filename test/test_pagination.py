@@ -0,0 +1,112 @@
+import asyncio
+import base64
+from datetime import datetime
+
+import pytest
+from bson.json_util import dumps
+from fastapi import HTTPException
+
+from pagination import decode_cursor, encode_cursor, fetch_page, keyset_filter
+
+SORT = [("created_at", -1), ("id", -1)]
+
+
+def token(values) -> str:
+    return base64.urlsafe_b64encode(dumps(values).encode("utf-8")).decode("ascii")
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, sort):
+        for field, direction in reversed(sort):
+            self.documents.sort(key=lambda document: document[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakePartition:
+    """Enough of a collection for fetch_page; ignores the query."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeCursor(list(self.documents))
+
+
+def test_cursor_round_trip():
+    document = {"created_at": datetime(2025, 3, 1, 12, 30), "id": "b"}
+    assert decode_cursor(encode_cursor(document, SORT), SORT) == [datetime(2025, 3, 1, 12, 30), "b"]
+
+
+@pytest.mark.parametrize("values", [
+    [{"$ne": None}, "a"],
+    ["2025-01-01", {"$gt": ""}],
+    [True, "a"],
+    ["a", False],
+    ["a"],
+    ["a", "b", "c"],
+    {"created_at": "a", "id": "b"},
+    "a",
+])
+def test_decode_cursor_rejects(values):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(token(values), SORT)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("raw", ["%%%", "bm9wZQ==", ""])
+def test_decode_cursor_rejects_garbage(raw):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(raw, SORT)
+    assert error.value.status_code == 400
+
+
+def test_keyset_filter_descending():
+    assert keyset_filter(SORT, ["t", "b"]) == {"$or": [
+        {"created_at": {"$lt": "t"}},
+        {"created_at": "t", "id": {"$lt": "b"}},
+    ]}
+
+
+def test_keyset_filter_mixed_directions():
+    assert keyset_filter([("category", 1), ("price", -1), ("id", 1)], ["c", 5, "x"]) == {"$or": [
+        {"category": {"$gt": "c"}},
+        {"category": "c", "price": {"$lt": 5}},
+        {"category": "c", "price": 5, "id": {"$gt": "x"}},
+    ]}
+
+
+def order(id: str, day: int) -> dict:
+    return {"id": id, "created_at": datetime(2025, 1, day)}
+
+
+def test_fetch_page_continues_across_partitions():
+    live = FakePartition([order("e", 5), order("d", 4)])
+    archive = FakePartition([order("c", 3), order("b", 2), order("a", 1)])
+    documents, next_cursor = asyncio.run(fetch_page((live, archive), {}, SORT, 3))
+    assert [document["id"] for document in documents] == ["e", "d", "c"]
+    assert decode_cursor(next_cursor, SORT) == [datetime(2025, 1, 3), "c"]
+
+
+def test_fetch_page_skips_document_in_both_partitions():
+    # "c" was copied to the archive but not yet deleted from the live partition
+    live = FakePartition([order("d", 4), order("c", 3)])
+    archive = FakePartition([order("c", 3), order("b", 2)])
+    documents, next_cursor = asyncio.run(fetch_page((live, archive), {}, SORT, 3))
+    assert [document["id"] for document in documents] == ["d", "c", "b"]
+    assert next_cursor is None
+
+
+def test_fetch_page_last_page_has_no_cursor():
+    documents, next_cursor = asyncio.run(fetch_page(FakePartition([order("a", 1)]), {}, SORT, 2))
+    assert [document["id"] for document in documents] == ["a"]
+    assert next_cursor is None
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from rollups import TOTAL_KEY, UNCATEGORIZED, counted, order_deltas, truncate
+
+CREATED = datetime(2025, 4, 2, 15, 42, 7, 900)
+HOUR = datetime(2025, 4, 2, 15)
+DAY = datetime(2025, 4, 2)
+
+
+def make_order(**overrides) -> dict:
+    order = {
+        "id": "o1",
+        "created_at": CREATED,
+        "status": "pending",
+        "items": [
+            {"product_id": "p1", "name": "Laptop", "category": "computers", "quantity": 2, "total": 200.0},
+            {"product_id": "p2", "name": "Mouse", "category": "computers", "quantity": 1, "total": 25.0},
+            {"product_id": "p3", "name": "Cable", "quantity": 3, "total": 9.0},
+        ],
+    }
+    order.update(overrides)
+    return order
+
+
+def test_truncate():
+    assert truncate(CREATED, "hour") == HOUR
+    assert truncate(CREATED, "day") == DAY
+
+
+def test_counted():
+    assert counted("pending") and counted("shipped") and counted(None)
+    assert not counted("cancelled")
+
+
+def test_order_deltas_per_dimension():
+    deltas = {}
+    order_deltas(make_order(), 1, deltas)
+    assert len(deltas) == 2 * (3 + 2 + 1)
+    for granularity, bucket in (("hour", HOUR), ("day", DAY)):
+        assert deltas[(granularity, "product", "p1", bucket)] == {
+            "revenue": 200.0, "orders": 1, "units": 2, "name": "Laptop",
+        }
+        assert deltas[(granularity, "category", "computers", bucket)] == {
+            "revenue": 225.0, "orders": 1, "units": 3, "name": None,
+        }
+        assert deltas[(granularity, "category", UNCATEGORIZED, bucket)]["revenue"] == 9.0
+        assert deltas[(granularity, "total", TOTAL_KEY, bucket)] == {
+            "revenue": 234.0, "orders": 1, "units": 6, "name": None,
+        }
+
+
+def test_order_deltas_accumulate_across_orders():
+    deltas = {}
+    order_deltas(make_order(), 1, deltas)
+    order_deltas(make_order(id="o2"), 1, deltas)
+    total = deltas[("day", "total", TOTAL_KEY, DAY)]
+    assert (total["revenue"], total["orders"], total["units"]) == (468.0, 2, 12)
+
+
+def test_order_deltas_removal_cancels_out():
+    deltas = {}
+    order_deltas(make_order(), 1, deltas)
+    order_deltas(make_order(), -1, deltas)
+    assert all((delta["revenue"], delta["orders"], delta["units"]) == (0, 0, 0) for delta in deltas.values())